@@ -4,60 +4,245 @@ OSINTZeUS - Open Source Intelligence Gathering Tool
 Backend API Server
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Blueprint, Flask, Request, Response, current_app, request, jsonify, send_file
 from flask_cors import CORS
+import atexit
 import os
 import json
 import uuid
 from datetime import datetime
 from werkzeug.utils import secure_filename
+import time
 import traceback
 
-from osint_modules.social_media import SocialMediaSearch
-from osint_modules.image_search import ImageSearch
-from osint_modules.phone_lookup import PhoneLookup
-from osint_modules.email_lookup import EmailLookup
-from osint_modules.address_lookup import AddressLookup
-from osint_modules.wifi_scanner import WiFiScanner
-from utils.report_generator import ReportGenerator
-
-app = Flask(__name__)
-CORS(app)
+from osint_modules.registry import ProviderDisabled
+from services import Services
+from utils.jobs import JobQueueFull
+from utils.uploads import ImageTooLarge, UploadedImage, UploadStream
 
 # Configuration
 UPLOAD_FOLDER = 'uploads'
+REPORT_FOLDER = 'reports'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_WIFI_NETWORKS = 200
+MAX_HISTORY_PAGE = 500
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+api = Blueprint('api', __name__, url_prefix='/api')
+
+def load_config():
+    """Runtime settings, read from the environment"""
+    return {
+        'UPLOAD_FOLDER': os.environ.get('UPLOAD_FOLDER', UPLOAD_FOLDER),
+        'REPORT_FOLDER': os.environ.get('REPORT_FOLDER', REPORT_FOLDER),
+        'REPORT_COMPRESSION': os.environ.get('REPORT_COMPRESSION', 'gzip'),  # gzip or zstd
+        'REPORT_MAX_COUNT': int(os.environ.get('REPORT_MAX_COUNT', 0)),  # 0 keeps every report
+        'REPORT_MAX_AGE_DAYS': float(os.environ.get('REPORT_MAX_AGE_DAYS', 0)),  # 0 keeps reports regardless of age
+        'MAX_CONTENT_LENGTH': MAX_FILE_SIZE,
+        'UPLOAD_SPOOL_MAX': int(os.environ.get('UPLOAD_SPOOL_MAX', 2 * 1024 * 1024)),  # bytes kept in memory per upload
+        'MODULE_TIMEOUT': float(os.environ.get('MODULE_TIMEOUT', 15)),  # seconds per module
+        'SEARCH_BUDGET': float(os.environ.get('SEARCH_BUDGET', 20)),  # seconds per request
+        'FANOUT_WORKERS': int(os.environ.get('FANOUT_WORKERS', 16)),
+        'CACHE_BACKEND': os.environ.get('CACHE_BACKEND', 'memory'),
+        'CACHE_PATH': os.environ.get('CACHE_PATH'),
+        'CACHE_MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 0)) or None,
+        'JOB_WORKERS': int(os.environ.get('JOB_WORKERS', 4)),
+        'JOB_QUEUE_DEPTH': int(os.environ.get('JOB_QUEUE_DEPTH', 32)),
+        'PROVIDERS': os.environ.get('PROVIDERS'),  # comma-separated subset; unset enables all
+        'PHONE_WARM_REGIONS': os.environ.get('PHONE_WARM_REGIONS'),  # e.g. US,GB; unset loads metadata on demand
+        'HISTORY_PATH': os.environ.get('HISTORY_PATH', 'history/history.db'),  # empty disables history
+        'IMAGE_INDEX_PATH': os.environ.get('IMAGE_INDEX_PATH', 'index/images.db'),  # empty disables the image index
+        'IMAGE_MATCH_DISTANCE': int(os.environ.get('IMAGE_MATCH_DISTANCE', 6)),  # max differing hash bits
+        'RESULT_RETENTION': float(os.environ.get('RESULT_RETENTION', 3600)),  # seconds search results stay reportable
+        'RESULT_RETENTION_MAX': int(os.environ.get('RESULT_RETENTION_MAX', 256)),  # searches retained at once
+        'RESULT_STORE_PATH': os.environ.get('RESULT_STORE_PATH', 'results/searches.db'),  # empty keeps them per process
+    }
+
+class UploadRequest(Request):
+    """Request whose multipart file parts are written straight into an UploadedImage"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        config = current_app.config
+        return UploadStream(UploadedImage(secure_filename(filename or ''), spool_max=config['UPLOAD_SPOOL_MAX'],
+                                          folder=config['UPLOAD_FOLDER']))
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
+def create_app(config=None, **overrides):
+    """Application factory: build a configured app with its own OSINT services.
 
-# Create uploads directory
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs('reports', exist_ok=True)
+    ``overrides`` (http_session, dns_resolver, gmaps) replace the default
+    transports, e.g. to run against local stub providers.
+    """
+    app = Flask(__name__)
+    app.request_class = UploadRequest
+    app.config.update(load_config())
+    app.config.update(config or {})
+    CORS(app)
+    
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    os.makedirs(app.config['REPORT_FOLDER'], exist_ok=True)
+    
+    services = Services(app.config, **overrides)
+    app.extensions['osintzeus'] = services
+    atexit.register(services.shutdown)
+    
+    app.register_blueprint(api)
+    app.register_error_handler(413, request_entity_too_large)
+    app.register_error_handler(404, not_found)
+    app.register_error_handler(500, internal_error)
+    return app
 
-# Initialize OSINT modules
-social_media = SocialMediaSearch()
-image_search = ImageSearch()
-phone_lookup = PhoneLookup()
-email_lookup = EmailLookup()
-address_lookup = AddressLookup()
-wifi_scanner = WiFiScanner()
-report_generator = ReportGenerator()
+def get_services() -> Services:
+    """Services of the app handling the current request"""
+    return current_app.extensions['osintzeus']
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-@app.route('/api/health', methods=['GET'])
+def cache_bypassed(data=None):
+    """True when the request asks to skip cached results (body or query string)"""
+    if data and data.get('cache') == 'bypass':
+        return True
+    return request.args.get('cache') == 'bypass'
+
+def wants_ndjson():
+    """True when the client opted into a streamed NDJSON response"""
+    if request.args.get('stream') == 'ndjson':
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+def stream_outcomes(services, header, calls, labels, on_complete=None, pools=None):
+    """Stream a header line, one line per call as it finishes, then a summary line.
+
+    ``labels`` maps each call key to the fields identifying its line
+    (module, platform, section). ``on_complete`` receives all outcomes and
+    may return extra summary fields. ``pools`` maps call keys to the FanOut
+    that runs them instead of the shared one.
+    """
+    timeout, budget = current_app.config['MODULE_TIMEOUT'], current_app.config['SEARCH_BUDGET']
+    
+    def generate():
+        start = time.monotonic()
+        yield json.dumps({'type': 'search', **header}) + '\n'
+        
+        outcomes = {}
+        for key, outcome in services.fan_out.iter_results(calls, timeout, budget, pools):
+            outcomes[key] = outcome
+            line = {'type': 'result', **labels[key], 'status': outcome['status'],
+                    'elapsed_ms': outcome['elapsed_ms'], 'result': outcome.get('result')}
+            if 'error' in outcome:
+                line['error'] = outcome['error']
+            yield json.dumps(line) + '\n'
+        
+        summary = {
+            'type': 'summary',
+            'search_id': header['search_id'],
+            'elapsed_ms': int((time.monotonic() - start) * 1000),
+            'status': {key: outcome['status'] for key, outcome in outcomes.items()},
+            'open_circuits': services.circuits.open_circuits()
+        }
+        if on_complete:
+            summary.update(on_complete(outcomes) or {})
+        yield json.dumps(summary) + '\n'
+    
+    return Response(generate(), mimetype=NDJSON_MIMETYPE,
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def stream_name_search(services, header, name, options, bypass):
+    """NDJSON name search; social media is split into one line per platform"""
+    result_cache = services.result_cache
+    calls = services.build_name_calls(name, options, bypass)
+    labels = {key: {'module': key} for key in calls}
+    
+    platforms, pools = [], {}
+    if 'social_media' in calls:
+        found, cached = (False, None) if bypass else result_cache.lookup('social_media', name)
+        if found:
+            calls['social_media'] = lambda: cached
+        else:
+            del calls['social_media'], labels['social_media']
+            # Probes run on the social media pool, as they do for a non-streamed search,
+            # so one streamed search cannot occupy every shared fan-out thread
+            social_media = services.social_media
+            for platform, probe in social_media.platform_probes(name).items():
+                key = f'social_media:{platform}'
+                calls[key] = probe
+                pools[key] = social_media.probe_pool
+                labels[key] = {'module': 'social_media', 'platform': platform}
+                platforms.append(platform)
+    
+    def on_complete(outcomes):
+        # Cache the assembled social media result only when every platform answered
+        probes = {platform: outcomes[f'social_media:{platform}'] for platform in platforms}
+        if probes and all(outcome['status'] == 'ok' for outcome in probes.values()):
+            result_cache.put('social_media', name,
+                             {platform: outcome['result'] for platform, outcome in probes.items()})
+        
+        # Record the search in the same shape the non-streamed endpoint returns
+        results = {}
+        for key, outcome in outcomes.items():
+            module, _, platform = key.partition(':')
+            value = outcome['result'] if outcome['status'] == 'ok' else outcome
+            if platform:
+                results.setdefault(module, {})[platform] = value
+            else:
+                results[module] = value
+        services.record_search(header['search_id'], 'name', name, results)
+    
+    return stream_outcomes(services, header, calls, labels, on_complete, pools)
+
+def stream_email_search(services, header, email, bypass):
+    """NDJSON email lookup with one line per result section"""
+    result_cache, email_lookup = services.result_cache, services.email_lookup
+    found, cached = (False, None) if bypass else result_cache.lookup('email', email)
+    valid = email_lookup.is_valid_format(email)
+    validation = {'email': email, 'valid_format': valid, 'domain': email.split('@')[1] if valid else None}
+    
+    # Sections are keyed 'email:<section>' so metrics count them as one email lookup
+    calls = {'email:validation': lambda: validation}
+    labels = {'email:validation': {'module': 'email', 'section': 'validation'}}
+    sections = email_lookup.section_calls(email) if valid else {}
+    for section, fn in sections.items():
+        calls[f'email:{section}'] = (lambda value=cached[section]: value) if found else fn
+        labels[f'email:{section}'] = {'module': 'email', 'section': section}
+    
+    def on_complete(outcomes):
+        failed = [outcome for outcome in outcomes.values() if outcome['status'] != 'ok']
+        services.record_call('email', {
+            'status': failed[0]['status'] if failed else 'ok',
+            'elapsed_ms': max(outcome['elapsed_ms'] for outcome in outcomes.values())
+        })
+        
+        result = dict(validation, domain_info={}, breach_data=[], social_profiles=[])
+        for section in sections:
+            outcome = outcomes[f'email:{section}']
+            result[section] = outcome.get('result', outcome)
+        services.record_search(header['search_id'], 'email', email, {'email': result})
+        if not found and not failed and email_lookup.is_complete(result):
+            result_cache.put('email', email, result)
+    
+    return stream_outcomes(services, header, calls, labels, on_complete)
+
+@api.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    services = get_services()
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'version': '1.0.0'
+        'version': '1.0.0',
+        **services.health(),
+        'cache': services.result_cache.stats(),
+        'single_flight': services.search_flights.stats(),
+        'jobs': services.job_manager.stats()
     })
 
-@app.route('/api/search/name', methods=['POST'])
+@api.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics for module, platform, outbound and cache activity"""
+    return Response(get_services().metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/search/name', methods=['POST'])
 def search_by_name():
     """Search by name or username"""
     try:
@@ -67,6 +252,8 @@ def search_by_name():
         
         name = data['name']
         options = data.get('options', {})
+        bypass = cache_bypassed(data)
+        services = get_services()
         
         results = {
             'query': name,
@@ -75,28 +262,29 @@ def search_by_name():
             'results': {}
         }
         
-        # Social media search
-        if options.get('social_media', True):
-            results['results']['social_media'] = social_media.search(name)
-        
-        # Email search
-        if options.get('email', True):
-            results['results']['emails'] = email_lookup.search_by_name(name)
+        if wants_ndjson():
+            del results['results']
+            return stream_name_search(services, results, name, options, bypass)
         
-        # Phone search
-        if options.get('phone', True):
-            results['results']['phones'] = phone_lookup.search_by_name(name)
+        calls = services.build_name_calls(name, options, bypass)
         
-        # Address search
-        if options.get('address', True):
-            results['results']['addresses'] = address_lookup.search_by_name(name)
+        # Run modules concurrently; slow or failing ones report their status instead
+        outcomes = services.fan_out.run(calls, current_app.config['MODULE_TIMEOUT'],
+                                        current_app.config['SEARCH_BUDGET'])
+        for key, outcome in outcomes.items():
+            if outcome['status'] == 'ok':
+                results['results'][key] = outcome['result']
+            else:
+                results['results'][key] = outcome
+        results['open_circuits'] = services.circuits.open_circuits()
+        services.record_search(results['search_id'], 'name', name, results['results'])
         
         return jsonify(results), 200
     
     except Exception as e:
         return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
 
-@app.route('/api/search/image', methods=['POST'])
+@api.route('/search/image', methods=['POST'])
 def search_by_image():
     """Reverse image search"""
     try:
@@ -111,79 +299,226 @@ def search_by_image():
             return jsonify({'error': 'Invalid file type'}), 400
         
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        services = get_services()
         
-        results = {
-            'query': filename,
-            'timestamp': datetime.now().isoformat(),
-            'search_id': str(uuid.uuid4()),
-            'results': image_search.reverse_search(filepath)
-        }
-        
-        # Clean up uploaded file
-        os.remove(filepath)
+        # The form parser wrote the upload into an UploadedImage (see UploadRequest);
+        # large ones spill to a unique temp file removed on exit
+        with file.stream.image as image:
+            search_id = str(uuid.uuid4())
+            engine_results, match = services.search_image(image, search_id, cache_bypassed())
+            results = {
+                'query': filename,
+                'timestamp': datetime.now().isoformat(),
+                'search_id': search_id,
+                'image': {'sha256': image.sha256, 'size': image.size},
+                'results': engine_results
+            }
+            if match is not None:
+                results['similar'] = match
+        services.record_search(results['search_id'], 'image', filename, {'image': results['results']})
         
         return jsonify(results), 200
     
+    except ImageTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except ProviderDisabled as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
 
-@app.route('/api/search/phone/<phone_number>', methods=['GET'])
+@api.route('/search/phone/<phone_number>', methods=['GET'])
 def search_by_phone(phone_number):
     """Search by phone number"""
     try:
+        services = get_services()
         results = {
             'query': phone_number,
             'timestamp': datetime.now().isoformat(),
             'search_id': str(uuid.uuid4()),
-            'results': phone_lookup.lookup(phone_number)
+            'results': services.lookup_now('phone', phone_number, services.phone_lookup.lookup,
+                                           cache_bypassed())
         }
+        results['open_circuits'] = services.circuits.open_circuits()
+        services.record_search(results['search_id'], 'phone', phone_number, {'phone': results['results']})
         return jsonify(results), 200
     
+    except ProviderDisabled as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/search/email/<email>', methods=['GET'])
+@api.route('/search/email/<email>', methods=['GET'])
 def search_by_email(email):
     """Search by email address"""
     try:
+        services = get_services()
+        if wants_ndjson():
+            header = {
+                'query': email,
+                'timestamp': datetime.now().isoformat(),
+                'search_id': str(uuid.uuid4())
+            }
+            return stream_email_search(services, header, email, cache_bypassed())
+        
         results = {
             'query': email,
             'timestamp': datetime.now().isoformat(),
             'search_id': str(uuid.uuid4()),
-            'results': email_lookup.lookup(email)
+            'results': services.lookup_now('email', email, services.email_lookup.lookup, cache_bypassed(),
+                                           cacheable=services.email_lookup.is_complete)
         }
+        results['open_circuits'] = services.circuits.open_circuits()
+        services.record_search(results['search_id'], 'email', email, {'email': results['results']})
         return jsonify(results), 200
     
+    except ProviderDisabled as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/search/wifi', methods=['POST'])
+@api.route('/search/wifi', methods=['POST'])
 def search_wifi():
     """Scan for WiFi networks (requires authorization)"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
         location = data.get('location') if data else None
+        limit = min(max(request.args.get('limit', 10, type=int), 1), MAX_WIFI_NETWORKS)
         
         results = {
             'timestamp': datetime.now().isoformat(),
             'search_id': str(uuid.uuid4()),
-            'results': wifi_scanner.scan(location)
+            'results': get_services().wifi_scanner.scan(location, limit)
         }
         return jsonify(results), 200
     
+    except ProviderDisabled as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/jobs', methods=['POST'])
+def create_job():
+    """Start a background search and return its job id immediately"""
+    try:
+        data = request.get_json()
+        if not data or not data.get('query'):
+            return jsonify({'error': 'Query is required'}), 400
+        
+        kind = data.get('type', 'name')
+        query = data['query']
+        bypass = cache_bypassed(data)
+        services = get_services()
+        
+        if kind == 'name':
+            calls = services.build_name_calls(query, data.get('options', {}), bypass)
+        elif kind == 'email':
+            calls = {'email': services.cached_call('email', query, services.email_lookup.lookup, bypass,
+                                                   cacheable=services.email_lookup.is_complete)}
+        elif kind == 'phone':
+            calls = {'phone': services.cached_call('phone', query, services.phone_lookup.lookup, bypass)}
+        else:
+            return jsonify({'error': f'Unsupported job type: {kind}'}), 400
+        
+        job = services.job_manager.submit(kind, query, calls, current_app.config['MODULE_TIMEOUT'],
+                                          current_app.config['SEARCH_BUDGET'])
+        return jsonify({'job_id': job.id, 'status': job.status, 'search_id': job.search_id}), 202
+    
+    except JobQueueFull as e:
+        return jsonify({'error': str(e)}), 503
+    except ProviderDisabled as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/report/<report_id>', methods=['GET'])
+@api.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get a job's status and the module results available so far"""
+    job = get_services().job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict()), 200
+
+@api.route('/jobs/<job_id>/events', methods=['GET'])
+def stream_job(job_id):
+    """Server-Sent Events stream pushing each module result as it completes"""
+    job_manager = get_services().job_manager
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    # A malformed resume point replays the stream from the start rather than failing
+    after = request.args.get('after', 0, type=int)
+    if request.headers.get('Last-Event-ID'):
+        try:
+            after = int(request.headers['Last-Event-ID'])
+        except ValueError:
+            after = 0
+    after = max(after, 0)
+    
+    def generate():
+        for event in job_manager.stream(job, after):
+            if event is None:
+                yield ': keep-alive\n\n'
+                continue
+            yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+    
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@api.route('/history', methods=['GET'])
+def search_history():
+    """Past searches, newest first, filtered by query, type, module, platform and time"""
+    history = get_services().history
+    if history is None:
+        return jsonify({'error': 'Search history is disabled'}), 404
+    try:
+        page = history.history(
+            query=request.args.get('query'),
+            kind=request.args.get('type'),
+            module=request.args.get('module'),
+            platform=request.args.get('platform'),
+            since=request.args.get('since', type=float),
+            until=request.args.get('until', type=float),
+            limit=min(max(request.args.get('limit', 50, type=int), 1), MAX_HISTORY_PAGE),
+            offset=max(request.args.get('offset', 0, type=int), 0)
+        )
+        return jsonify(page), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/history/changes', methods=['GET'])
+def search_changes():
+    """Findings added or removed since the previous search of a target"""
+    history = get_services().history
+    if history is None:
+        return jsonify({'error': 'Search history is disabled'}), 404
+    query = request.args.get('query')
+    if not query:
+        return jsonify({'error': 'Query is required'}), 400
+    changes = history.changes(query, request.args.get('type', 'name'), request.args.get('since'))
+    if changes is None:
+        return jsonify({'error': 'No searches recorded for this target'}), 404
+    return jsonify(changes), 200
+
+@api.route('/history/<search_id>', methods=['GET'])
+def get_search(search_id):
+    """A recorded search with all of its findings"""
+    history = get_services().history
+    search = history.get(search_id) if history is not None else None
+    if search is None:
+        return jsonify({'error': 'Search not found'}), 404
+    return jsonify(search), 200
+
+@api.route('/report/<report_id>', methods=['GET'])
 def get_report(report_id):
-    """Get generated OSINT report"""
+    """Get generated OSINT report (``?sections=summary,findings`` skips raw_data)"""
     try:
-        report_path = os.path.join('reports', f'{report_id}.json')
-        if os.path.exists(report_path):
-            with open(report_path, 'r') as f:
-                report = json.load(f)
+        sections = request.args.get('sections')
+        report = get_services().report_store.load(
+            secure_filename(report_id),
+            sections=[section.strip() for section in sections.split(',')] if sections else None
+        )
+        if report is not None:
             return jsonify(report), 200
         else:
             return jsonify({'error': 'Report not found'}), 404
@@ -191,20 +526,27 @@ def get_report(report_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/report/generate', methods=['POST'])
+@api.route('/report/generate', methods=['POST'])
 def generate_report():
-    """Generate comprehensive OSINT report"""
+    """Generate comprehensive OSINT report from a recent search_id or posted search_results"""
     try:
-        data = request.get_json()
-        search_results = data.get('search_results', {})
+        data = request.get_json() or {}
+        services = get_services()
+        search_id = data.get('search_id')
+        aggregator = None
+        if search_id:
+            retained = services.retained_search(search_id)
+            if retained is None:
+                return jsonify({'error': 'Search results expired or unknown; send search_results instead'}), 404
+            search_results, aggregator = retained
+        else:
+            search_results = data.get('search_results', {})
         
         report_id = str(uuid.uuid4())
-        report = report_generator.generate(search_results, report_id)
+        report = services.report_generator.generate(search_results, report_id, aggregator)
         
         # Save report
-        report_path = os.path.join('reports', f'{report_id}.json')
-        with open(report_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        services.report_store.save(report)
         
         return jsonify({
             'report_id': report_id,
@@ -214,20 +556,17 @@ def generate_report():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.errorhandler(413)
 def request_entity_too_large(error):
     return jsonify({'error': 'File too large'}), 413
 
-@app.errorhandler(404)
 def not_found(error):
     return jsonify({'error': 'Endpoint not found'}), 404
 
-@app.errorhandler(500)
 def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
-    app.run(host='0.0.0.0', port=port, debug=debug)
+    create_app().run(host='0.0.0.0', port=port, debug=debug)
 
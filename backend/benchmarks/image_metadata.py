@@ -0,0 +1,123 @@
+"""
+Image Metadata Benchmark
+Times header-only EXIF/GPS extraction against a full pixel decode of large JPEG and PNG uploads
+
+Run from the backend directory:
+    python -m benchmarks.image_metadata --size-mb 10 --runs 50
+"""
+
+import argparse
+import io
+import json
+import statistics
+import time
+from typing import Callable, Dict
+
+import numpy as np
+from PIL import ExifTags, Image, PngImagePlugin
+
+from osint_modules.image_search import ImageSearch
+from utils.uploads import UploadedImage
+
+class CountingStream(io.BytesIO):
+    """BytesIO that counts the bytes a reader actually pulls"""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+class CountingUpload(UploadedImage):
+    """Upload whose streams remember how much of the file each consumer read"""
+
+    def open(self) -> CountingStream:
+        self.last_stream = CountingStream(self.data)
+        return self.last_stream
+
+FORMATS = ('jpeg', 'png')
+
+def make_image(size_mb: float, fmt: str = 'jpeg') -> bytes:
+    """A noisy image of roughly ``size_mb`` megabytes.
+
+    The JPEG carries camera and GPS tags. The PNG has only a Software text
+    chunk and no EXIF, the case where asking Pillow for EXIF decodes pixels.
+    """
+    exif = Image.Exif()
+    exif[ExifTags.Base.Make] = 'BenchCam'
+    exif[ExifTags.Base.Model] = 'Model 1'
+    exif[ExifTags.Base.Software] = 'bench 1.0'
+    exif.get_ifd(ExifTags.IFD.GPSInfo).update({
+        ExifTags.GPS.GPSLatitudeRef: 'N', ExifTags.GPS.GPSLatitude: (48.0, 51.0, 29.0),
+        ExifTags.GPS.GPSLongitudeRef: 'E', ExifTags.GPS.GPSLongitude: (2.0, 17.0, 40.0),
+    })
+
+    def encode(width: int, height: int) -> bytes:
+        pixels = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+        buffer = io.BytesIO()
+        if fmt == 'png':
+            text = PngImagePlugin.PngInfo()
+            text.add_text('Software', 'bench 1.0')
+            Image.fromarray(pixels).save(buffer, 'PNG', pnginfo=text, compress_level=1)
+        else:
+            Image.fromarray(pixels).save(buffer, 'JPEG', quality=90, exif=exif)
+        return buffer.getvalue()
+
+    # Scale a small sample to the requested file size
+    sample = encode(800, 600)
+    scale = (size_mb * 1024 * 1024 / len(sample)) ** 0.5
+    return encode(int(800 * scale), int(600 * scale))
+
+def full_decode(image: UploadedImage) -> Dict:
+    """What extraction would cost if it decoded the pixels"""
+    with image.open() as stream, Image.open(stream) as picture:
+        picture.load()
+        return {'width': picture.width, 'height': picture.height, 'exif': len(picture.getexif())}
+
+def measure(fn: Callable, image: CountingUpload, runs: int) -> Dict:
+    """Median and p95 latency of ``runs`` calls and how much of the file one call reads"""
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(image)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        'read_kb': round(image.last_stream.bytes_read / 1024, 1)
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark header-only image metadata extraction')
+    parser.add_argument('--size-mb', type=float, default=10, help='approximate size of each test image')
+    parser.add_argument('--formats', default=','.join(FORMATS), help='comma-separated subset of jpeg,png')
+    parser.add_argument('--runs', type=int, default=50, help='calls per measurement')
+    parser.add_argument('--json', dest='json_path', help='also write results to this file')
+    args = parser.parse_args(argv)
+
+    search = ImageSearch()
+    results = {}
+    for fmt in args.formats.split(','):
+        data = make_image(args.size_mb, fmt)
+        image = CountingUpload.read(io.BytesIO(data), f'bench.{fmt}', spool_max=len(data))
+        print(f"{fmt}: {len(data) / 1024 / 1024:.1f} MB, metadata: {json.dumps(search.extract_metadata(image))}")
+
+        results[fmt] = {
+            'size_mb': round(len(data) / 1024 / 1024, 1),
+            'header_only': measure(search.extract_metadata, image, args.runs),
+            'full_decode': measure(full_decode, image, max(1, args.runs // 10))
+        }
+        for name in ('header_only', 'full_decode'):
+            result = results[fmt][name]
+            print(f"  {name:<12} p50 {result['p50_ms']:>9.3f} ms  p95 {result['p95_ms']:>9.3f} ms  "
+                  f"read {result['read_kb']:>9.1f} KB")
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
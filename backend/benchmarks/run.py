@@ -0,0 +1,198 @@
+"""
+Benchmark Harness
+Drives /api/search/* against local stub providers and reports throughput and latency
+
+Run from the backend directory:
+    python -m benchmarks.run --concurrency 16 --requests 200 --latency-ms 50
+"""
+
+import argparse
+import itertools
+import json
+import resource
+import statistics
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import requests
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app import create_app
+from benchmarks.stubs import (Behaviour, FakeGoogleMapsClient, StubDNSServer,
+                              StubHTTPServer, stub_session)
+from utils.ratelimit import OutboundScheduler
+from utils.resolver import CachingResolver
+
+SCENARIOS = ('name', 'name_stream', 'email', 'phone')
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Request handler that skips per-request access logging"""
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+class Harness:
+    """Stub providers plus an in-process API server wired to them"""
+
+    def __init__(self, behaviour: Behaviour, page_kb: int, config: Dict = None,
+                 scheduler: OutboundScheduler = None):
+        self.http_stub = StubHTTPServer(behaviour, page_kb=page_kb).start()
+        self.dns_stub = StubDNSServer(['example.com'], Behaviour(
+            latency_ms=behaviour.latency_ms / 10, jitter_ms=behaviour.jitter_ms / 10,
+            error_rate=behaviour.error_rate)).start()
+        self.gmaps = FakeGoogleMapsClient(behaviour)
+
+        # Nothing is persisted, so runs leave no history, index or retained-search files behind
+        self.app = create_app(
+            dict({'HISTORY_PATH': '', 'IMAGE_INDEX_PATH': '', 'RESULT_STORE_PATH': ''}, **(config or {})),
+            http_session=stub_session(self.http_stub.port, scheduler),
+            dns_resolver=CachingResolver(['127.0.0.1'], port=self.dns_stub.port, timeout=5),
+            gmaps=self.gmaps
+        )
+        self.server = make_server('127.0.0.1', 0, self.app, threaded=True,
+                                  request_handler=QuietRequestHandler)
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}/api'
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.http_stub.stop()
+        self.dns_stub.stop()
+        self.app.extensions['osintzeus'].shutdown()
+
+    def request_factory(self, scenario: str, use_cache: bool) -> Callable[[requests.Session, int], int]:
+        """Build a function issuing the i-th request of a scenario and returning its status"""
+        suffix = '' if use_cache else '?cache=bypass'
+
+        def name(session, i):
+            body = {'name': f'user{i}'} if use_cache else {'name': f'user{i}', 'cache': 'bypass'}
+            return session.post(f'{self.base_url}/search/name', json=body, timeout=60).status_code
+
+        def name_stream(session, i):
+            body = {'name': f'user{i}'} if use_cache else {'name': f'user{i}', 'cache': 'bypass'}
+            response = session.post(f'{self.base_url}/search/name?stream=ndjson', json=body, timeout=60)
+            response.content  # the search is only over once the summary line arrives
+            return response.status_code
+
+        def email(session, i):
+            return session.get(f'{self.base_url}/search/email/user{i}@example.com{suffix}', timeout=60).status_code
+
+        def phone(session, i):
+            number = f'+1650253{i % 10000:04d}'
+            return session.get(f'{self.base_url}/search/phone/{number}{suffix}', timeout=60).status_code
+
+        return {'name': name, 'name_stream': name_stream, 'email': email, 'phone': phone}[scenario]
+
+def run_scenario(harness: Harness, scenario: str, total: int, concurrency: int,
+                 use_cache: bool) -> Dict:
+    """Issue ``total`` requests with ``concurrency`` clients and summarise them"""
+    send = harness.request_factory(scenario, use_cache)
+    counter = itertools.count()
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+
+    def client():
+        session = requests.Session()
+        while True:
+            i = next(counter)
+            if i >= total:
+                return
+            start = time.perf_counter()
+            try:
+                status = send(session, i)
+            except requests.RequestException:
+                status = 'error'
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    wall = time.perf_counter() - started
+
+    return {
+        'scenario': scenario,
+        'requests': total,
+        'concurrency': concurrency,
+        'wall_s': round(wall, 3),
+        'throughput_rps': round(total / wall, 2) if wall else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+        'mean_ms': round(statistics.fmean(latencies), 1) if latencies else 0.0,
+        'statuses': {str(k): v for k, v in statuses.items()},
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark OSINTZeUS against local stub providers')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help='comma-separated subset of: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent clients')
+    parser.add_argument('--latency-ms', type=float, default=50, help='stub provider latency')
+    parser.add_argument('--jitter-ms', type=float, default=10, help='stub latency jitter')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of stub calls that fail')
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help='fraction of stub HTTP calls answered with 429')
+    parser.add_argument('--host-rate', type=float, default=0.0,
+                        help='per-host outbound requests/second (0 disables pacing)')
+    parser.add_argument('--page-kb', type=int, default=64, help='size of stub profile pages')
+    parser.add_argument('--use-cache', action='store_true', help='allow result-cache hits')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='also report Python heap peaks (tracemalloc slows the run)')
+    parser.add_argument('--json', dest='json_path', help='also write results to this file')
+    args = parser.parse_args(argv)
+
+    if args.trace_memory:
+        tracemalloc.start()
+    behaviour = Behaviour(args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate)
+    scheduler = None
+    if args.host_rate > 0:
+        scheduler = OutboundScheduler(rate=args.host_rate, burst=max(1.0, args.host_rate), overrides={})
+    harness = Harness(behaviour, args.page_kb, scheduler=scheduler)
+    try:
+        results = []
+        for scenario in args.scenarios.split(','):
+            result = run_scenario(harness, scenario.strip(), args.requests, args.concurrency, args.use_cache)
+            result['max_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+            if args.trace_memory:
+                result['py_heap_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+                tracemalloc.reset_peak()
+            results.append(result)
+            print(f"{result['scenario']:<11} {result['throughput_rps']:>8.1f} req/s  "
+                  f"p50 {result['p50_ms']:>7.1f} ms  p95 {result['p95_ms']:>7.1f} ms  "
+                  f"p99 {result['p99_ms']:>7.1f} ms  rss {result['max_rss_mb']:>6.1f} MB  "
+                  f"statuses {result['statuses']}")
+        report = {
+            'settings': vars(args),
+            'stub_http_requests': harness.http_stub.requests,
+            'stub_dns_queries': harness.dns_stub.queries,
+            'throttling': harness.app.extensions['osintzeus'].http_session.scheduler.stats(),
+            'results': results
+        }
+        if args.json_path:
+            with open(args.json_path, 'w') as f:
+                json.dump(report, f, indent=2)
+        return report
+    finally:
+        harness.stop()
+        if args.trace_memory:
+            tracemalloc.stop()
+
+if __name__ == '__main__':
+    main()
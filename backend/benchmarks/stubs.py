@@ -0,0 +1,256 @@
+"""
+Benchmark Stubs
+Local stand-ins for the providers OSINTZeUS talks to, with tunable latency and errors
+"""
+
+import json
+import random
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import urlsplit, urlunsplit, parse_qs
+
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+from requests.adapters import HTTPAdapter
+
+from utils.http import OutboundSession
+from utils.ratelimit import OutboundScheduler
+
+class Behaviour:
+    """Latency and failure profile shared by every stub"""
+
+    def __init__(self, latency_ms: float = 50, jitter_ms: float = 10, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+
+    def delay(self):
+        """Sleep for the configured latency plus uniform jitter"""
+        latency = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+    def should_fail(self) -> bool:
+        return random.random() < self.error_rate
+
+    def should_throttle(self) -> bool:
+        return random.random() < self.throttle_rate
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer that ignores clients hanging up mid-response.
+
+    Capped streamed reads close the connection once they have enough of a
+    page, so a reset or broken pipe is expected, not worth a traceback.
+    """
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+class StubHTTPServer:
+    """Threaded HTTP server imitating GitHub search and social profile pages.
+
+    ``GET /search/users?q=<name>`` returns GitHub-style JSON. Any other path
+    is treated as a profile page: 404 when the URL mentions "missing",
+    otherwise 200 with ``page_kb`` of HTML. ``throttle_rate`` of requests
+    get a 429 with ``Retry-After: 1``.
+    """
+
+    def __init__(self, behaviour: Behaviour = None, page_kb: int = 64):
+        self.behaviour = behaviour or Behaviour()
+        self.page = ('<html><body>' + 'x' * (page_kb * 1024) + '</body></html>').encode()
+        self.requests = 0
+        self._server = _QuietHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> 'StubHTTPServer':
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                stub.requests += 1
+                stub.behaviour.delay()
+                if stub.behaviour.should_fail():
+                    return self._send(503, b'unavailable', 'text/plain')
+                if stub.behaviour.should_throttle():
+                    return self._send(429, b'slow down', 'text/plain', {'Retry-After': '1'})
+
+                url = urlsplit(self.path)
+                if url.path == '/search/users':
+                    query = parse_qs(url.query).get('q', [''])[0]
+                    items = [{
+                        'login': f'{query}{i}',
+                        'html_url': f'https://github.com/{query}{i}',
+                        'avatar_url': f'https://avatars.example/{query}{i}',
+                        'type': 'User'
+                    } for i in range(3)]
+                    body = json.dumps({'total_count': len(items), 'items': items}).encode()
+                    return self._send(200, body, 'application/json')
+
+                if 'missing' in self.path:
+                    return self._send(404, b'<html>Not found</html>', 'text/html')
+                return self._send(200, stub.page, 'text/html')
+
+            def do_HEAD(self):
+                self.do_GET()
+
+            def _send(self, status: int, body: bytes, content_type: str, headers: Dict = None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                for header, value in (headers or {}).items():
+                    self.send_header(header, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+class StubRoutingAdapter(HTTPAdapter):
+    """Transport adapter that sends every request to a local stub server.
+
+    The original host is kept in the Host header so the stub (and any
+    per-host logic in the session) still sees which provider was targeted.
+    """
+
+    def __init__(self, port: int, **kwargs):
+        self.stub_port = port
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        request.headers['Host'] = url.netloc
+        request.url = urlunsplit(('http', f'127.0.0.1:{self.stub_port}', url.path, url.query, ''))
+        return super().send(request, **kwargs)
+
+def stub_session(port: int, scheduler: OutboundScheduler = None) -> OutboundSession:
+    """An OutboundSession whose HTTP(S) traffic all goes to the stub server.
+
+    Without a scheduler, per-host pacing is off so runs measure the server
+    rather than the provider limits.
+    """
+    session = OutboundSession(scheduler=scheduler or OutboundScheduler(rate=0, max_concurrent=64, overrides={}))
+    adapter = StubRoutingAdapter(port, pool_connections=32, pool_maxsize=64)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+class StubDNSServer:
+    """UDP DNS server answering from a small in-memory zone.
+
+    Names absent from the zone get NXDOMAIN; ``error_rate`` turns answers
+    into SERVFAIL.
+    """
+
+    DEFAULT_ZONE = {
+        'MX': ['10 mx1.{domain}.', '20 mx2.{domain}.'],
+        'A': ['192.0.2.10'],
+        'AAAA': ['2001:db8::10'],
+        'TXT': ['"v=spf1 include:_spf.{domain} -all"'],
+    }
+
+    def __init__(self, domains: List[str] = None, behaviour: Behaviour = None, ttl: int = 300):
+        self.behaviour = behaviour or Behaviour(latency_ms=5, jitter_ms=2)
+        self.ttl = ttl
+        self.queries = 0
+        self.zone = {}
+        for domain in domains or ['example.com']:
+            for rdtype, records in self.DEFAULT_ZONE.items():
+                self.zone[(f'{domain}.', rdtype)] = [r.format(domain=domain) for r in records]
+            self.zone[(f'_dmarc.{domain}.', 'TXT')] = ['"v=DMARC1; p=reject"']
+        self._names = {name for name, _ in self.zone}
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind(('127.0.0.1', 0))
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._sock.getsockname()[1]
+
+    def start(self) -> 'StubDNSServer':
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._sock.close()
+
+    def _serve(self):
+        while self._running:
+            try:
+                data, addr = self._sock.recvfrom(4096)
+            except OSError:
+                return
+            threading.Thread(target=self._answer, args=(data, addr), daemon=True).start()
+
+    def _answer(self, data: bytes, addr):
+        self.queries += 1
+        query = dns.message.from_wire(data)
+        response = dns.message.make_response(query)
+        question = query.question[0]
+        name = question.name.to_text().lower()
+        rdtype = dns.rdatatype.to_text(question.rdtype)
+
+        self.behaviour.delay()
+        if self.behaviour.should_fail():
+            response.set_rcode(dns.rcode.SERVFAIL)
+        elif (name, rdtype) in self.zone:
+            response.answer.append(dns.rrset.from_text(name, self.ttl, 'IN', rdtype, *self.zone[(name, rdtype)]))
+        elif name not in self._names:
+            response.set_rcode(dns.rcode.NXDOMAIN)
+        try:
+            self._sock.sendto(response.to_wire(), addr)
+        except OSError:
+            pass
+
+class FakeGoogleMapsClient:
+    """Stand-in for googlemaps.Client covering the calls AddressLookup makes"""
+
+    def __init__(self, behaviour: Behaviour = None):
+        self.behaviour = behaviour or Behaviour()
+        self.calls = 0
+
+    def geocode(self, address: str) -> List[Dict]:
+        self.calls += 1
+        self.behaviour.delay()
+        if self.behaviour.should_fail():
+            raise RuntimeError('Fake Google Maps error')
+        return [{
+            'formatted_address': f'{i + 1} {address} Street, Springfield',
+            'geometry': {'location': {'lat': 40.0 + i / 100, 'lng': -75.0 - i / 100}},
+            'place_id': f'fake-place-{i}',
+            'types': ['street_address']
+        } for i in range(2)]
+
+    def reverse_geocode(self, latlng) -> List[Dict]:
+        self.calls += 1
+        self.behaviour.delay()
+        return [{'formatted_address': f'{latlng[0]:.4f},{latlng[1]:.4f} Fake Road'}]
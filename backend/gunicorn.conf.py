@@ -0,0 +1,35 @@
+"""
+Gunicorn configuration for OSINTZeUS
+All settings can be overridden with environment variables
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Lookups are I/O bound, so one worker process serves many requests on threads. Jobs,
+# single-flight, per-host rate limits, circuit breakers and metrics live in process
+# memory, so extra workers would each see only part of that state (see DEPLOYMENT.md)
+worker_class = 'gthread'
+workers = int(os.environ.get('GUNICORN_WORKERS', 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 32))
+
+# A request may run for SEARCH_BUDGET seconds; leave headroom before killing the worker
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycling a worker drops its jobs and rate-limit state, so it is off unless asked for
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+def worker_exit(server, worker):
+    """Drain background jobs and worker pools before the process exits"""
+    import sys
+    wsgi = sys.modules.get('wsgi')
+    if wsgi is not None:
+        wsgi.app.extensions['osintzeus'].shutdown()
@@ -4,22 +4,33 @@ Address and Location Lookup Module
 
 import requests
 from typing import Dict, List
-import googlemaps
 import os
 
+from utils.circuit import CircuitBoard, CircuitOpen, get_circuit_board
+from utils.http import get_session
+from utils.ratelimit import Throttled
+
 class AddressLookup:
     """Address and location lookup"""
     
-    def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        # Initialize Google Maps client if API key is available
-        self.gmaps = None
+    def __init__(self, session: requests.Session = None, gmaps=None, circuits: CircuitBoard = None):
+        self.session = session or get_session()
+        # A Google Maps outage fails fast instead of holding each lookup for the full timeout
+        self.maps_circuit = (circuits or get_circuit_board()).get('google_maps')
+        # Initialize Google Maps client if API key is available (or use the one given)
+        self.gmaps = gmaps
+        # Errors meaning the API answered (bad request, quota, ...) rather than being down
+        self.api_errors = ()
+        # The client's wrapper around exceptions raised by the HTTP session
+        self.transport_errors = ()
         api_key = os.environ.get('GOOGLE_MAPS_API_KEY')
-        if api_key:
+        if self.gmaps is None and api_key:
             try:
-                self.gmaps = googlemaps.Client(key=api_key)
+                # Imported here so deployments without a Maps key never load the client
+                import googlemaps
+                self.gmaps = googlemaps.Client(key=api_key, requests_session=self.session)
+                self.api_errors = googlemaps.exceptions.ApiError
+                self.transport_errors = googlemaps.exceptions.TransportError
             except Exception as e:
                 print(f"Google Maps initialization error: {e}")
     
@@ -29,7 +40,7 @@ class AddressLookup:
         try:
             if self.gmaps:
                 # Use Google Maps Geocoding API
-                geocode_result = self.gmaps.geocode(name)
+                geocode_result = self._maps('geocode', name)
                 for result in geocode_result[:5]:
                     results.append({
                         'formatted_address': result.get('formatted_address'),
@@ -42,8 +53,12 @@ class AddressLookup:
                     'note': 'Google Maps API key required for address lookup',
                     'name': name
                 })
+        except (Throttled, CircuitOpen):
+            raise
         except Exception as e:
+            # Raised rather than answered with an empty list, which would be cached as "nothing found"
             print(f"Address lookup error: {e}")
+            raise
         return results
     
     def geocode(self, address: str) -> Dict:
@@ -56,7 +71,7 @@ class AddressLookup:
         
         try:
             if self.gmaps:
-                geocode_result = self.gmaps.geocode(address)
+                geocode_result = self._maps('geocode', address)
                 if geocode_result:
                     location = geocode_result[0].get('geometry', {}).get('location')
                     result['coordinates'] = {
@@ -64,6 +79,8 @@ class AddressLookup:
                         'lng': location.get('lng')
                     }
                     result['formatted_address'] = geocode_result[0].get('formatted_address')
+        except (Throttled, CircuitOpen):
+            raise
         except Exception as e:
             result['error'] = str(e)
         
@@ -78,11 +95,35 @@ class AddressLookup:
         
         try:
             if self.gmaps:
-                reverse_result = self.gmaps.reverse_geocode((lat, lng))
+                reverse_result = self._maps('reverse_geocode', (lat, lng))
                 if reverse_result:
                     result['address'] = reverse_result[0].get('formatted_address')
+        except (Throttled, CircuitOpen):
+            raise
         except Exception as e:
             result['error'] = str(e)
         
         return result
+    
+    def _maps(self, method: str, *args):
+        """Call the Google Maps client through its circuit breaker.
 
+        The client wraps session exceptions in ``TransportError``; a request
+        the session refused (Throttled, CircuitOpen) is re-raised unwrapped
+        and says nothing about the health of the API.
+        """
+        self.maps_circuit.allow()
+        try:
+            result = getattr(self.gmaps, method)(*args)
+        except self.api_errors:
+            self.maps_circuit.record_success()
+            raise
+        except Exception as e:
+            refused = e.base_exception if isinstance(e, self.transport_errors) else e
+            if isinstance(refused, (Throttled, CircuitOpen)):
+                self.maps_circuit.release()
+                raise refused from None
+            self.maps_circuit.record_failure()
+            raise
+        self.maps_circuit.record_success()
+        return result
@@ -4,18 +4,23 @@ Email Lookup Module
 
 import re
 import requests
-import dns.resolver
-from typing import Dict, List
+from functools import partial
+from typing import Callable, Dict, List
 import socket
 import smtplib
 
+from utils.http import get_session
+from utils.resolver import CachingResolver, get_resolver
+
+# DNS answers that settle the question; any other error (SERVFAIL, timeout) may clear up on retry
+DEFINITIVE_DNS_ERRORS = ('NXDOMAIN', 'NoAnswer')
+
 class EmailLookup:
     """Email address lookup and validation"""
     
-    def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+    def __init__(self, session: requests.Session = None, resolver: CachingResolver = None):
+        self.session = session or get_session()
+        self.resolver = resolver or get_resolver()
     
     def lookup(self, email: str) -> Dict:
         """Lookup email information"""
@@ -29,16 +34,36 @@ class EmailLookup:
         }
         
         # Validate email format
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if re.match(email_pattern, email):
+        if self.is_valid_format(email):
             results['valid_format'] = True
             results['domain'] = email.split('@')[1]
-            results['domain_info'] = self.get_domain_info(results['domain'])
-            results['breach_data'] = self.check_breaches(email)
-            results['social_profiles'] = self.search_social_profiles(email)
+            for section, fn in self.section_calls(email).items():
+                results[section] = fn()
         
         return results
     
+    @staticmethod
+    def is_complete(result: Dict) -> bool:
+        """True unless a domain lookup failed transiently, so the result is safe to cache"""
+        domain_info = result.get('domain_info', {})
+        errors = list(domain_info.get('lookup_errors', {}).values())
+        if 'error' in domain_info:
+            errors.append(domain_info['error'])
+        return all(error in DEFINITIVE_DNS_ERRORS for error in errors)
+    
+    def is_valid_format(self, email: str) -> bool:
+        """Check the address against a basic email pattern"""
+        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+        return re.match(email_pattern, email) is not None
+    
+    def section_calls(self, email: str) -> Dict[str, Callable]:
+        """Bound lookups for each result section of a well-formed address"""
+        return {
+            'domain_info': partial(self.get_domain_info, email.split('@')[1]),
+            'breach_data': partial(self.check_breaches, email),
+            'social_profiles': partial(self.search_social_profiles, email),
+        }
+    
     def search_by_name(self, name: str) -> List[Dict]:
         """Search for email addresses by name"""
         # This would typically use email finder APIs
@@ -65,16 +90,45 @@ class EmailLookup:
         info = {
             'domain': domain,
             'mx_records': [],
-            'has_mx': False
+            'has_mx': False,
+            'a_records': [],
+            'aaaa_records': [],
+            'spf': None,
+            'dmarc': None
         }
         
-        try:
-            mx_records = dns.resolver.resolve(domain, 'MX')
-            info['has_mx'] = True
-            for mx in mx_records:
-                info['mx_records'].append(str(mx.exchange))
-        except Exception as e:
-            info['error'] = str(e)
+        # MX, address and policy records are fetched concurrently and cached by TTL
+        answers = self.resolver.resolve_many([
+            (domain, 'MX'),
+            (domain, 'A'),
+            (domain, 'AAAA'),
+            (domain, 'TXT'),
+            (f'_dmarc.{domain}', 'TXT'),
+        ])
+        
+        mx = answers[(domain, 'MX')]
+        if 'error' in mx:
+            info['error'] = mx['error']
+        else:
+            info['has_mx'] = bool(mx['records'])
+            info['mx_records'] = list(mx['records'])
+        
+        info['a_records'] = list(answers[(domain, 'A')]['records'])
+        info['aaaa_records'] = list(answers[(domain, 'AAAA')]['records'])
+        info['spf'] = next((txt for txt in answers[(domain, 'TXT')]['records']
+                            if txt.lower().startswith('v=spf1')), None)
+        info['dmarc'] = next((txt for txt in answers[(f'_dmarc.{domain}', 'TXT')]['records']
+                              if txt.lower().startswith('v=dmarc1')), None)
+        
+        # A failed lookup reads as an empty record list, so keep its error for is_complete
+        lookup_errors = {
+            label: answers[query]['error']
+            for label, query in (('A', (domain, 'A')), ('AAAA', (domain, 'AAAA')),
+                                 ('TXT', (domain, 'TXT')), ('DMARC', (f'_dmarc.{domain}', 'TXT')))
+            if 'error' in answers[query]
+        }
+        if lookup_errors:
+            info['lookup_errors'] = lookup_errors
         
         return info
     
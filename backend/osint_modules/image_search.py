@@ -3,29 +3,119 @@ Image Reverse Search Module
 Performs reverse image searches across multiple platforms
 """
 
+import math
 import requests
-import base64
-from typing import Dict, List
-import os
+from typing import Dict, List, Optional
+from PIL import ExifTags, Image
+
+from utils.http import get_session
+from utils.uploads import ImageTooLarge, UploadedImage, check_pixels
+
+# Camera and software tags reported from the main and Exif IFDs
+CAMERA_TAGS = {
+    'make': ExifTags.Base.Make,
+    'model': ExifTags.Base.Model,
+    'lens': ExifTags.Base.LensModel,
+    'serial_number': ExifTags.Base.BodySerialNumber,
+    'software': ExifTags.Base.Software,
+    'artist': ExifTags.Base.Artist,
+    'taken_at': ExifTags.Base.DateTimeOriginal,
+}
+
+# Longest text kept from a single tag
+MAX_TAG_LENGTH = 256
 
 class ImageSearch:
     """Reverse image search functionality"""
     
-    def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+    def __init__(self, session: requests.Session = None):
+        self.session = session or get_session()
     
-    def reverse_search(self, image_path: str) -> Dict[str, List[Dict]]:
-        """Perform reverse image search"""
+    def reverse_search(self, image: UploadedImage) -> Dict:
+        """Perform reverse image search (every engine shares the upload's bytes)"""
         results = {
-            'google': self.search_google_images(image_path),
-            'tineye': self.search_tineye(image_path),
-            'yandex': self.search_yandex(image_path),
+            'google': self.search_google_images(image),
+            'tineye': self.search_tineye(image),
+            'yandex': self.search_yandex(image),
+            'metadata': self.extract_metadata(image),
         }
         return results
     
-    def search_google_images(self, image_path: str) -> List[Dict]:
+    def check_size(self, image: UploadedImage):
+        """Raise ImageTooLarge when the header declares more pixels than allowed (nothing is decoded)"""
+        try:
+            with image.open() as stream, Image.open(stream) as picture:
+                width, height = picture.size
+        except Image.DecompressionBombError as e:
+            raise ImageTooLarge(str(e)) from e
+        except OSError:
+            # Not an image Pillow can read; extract_metadata reports why
+            return
+        check_pixels(width, height)
+    
+    def extract_metadata(self, image: UploadedImage) -> Dict:
+        """Format, dimensions, camera, software and GPS tags of an image.
+
+        Only the file header is parsed: Pillow reads the format, size and
+        EXIF segments on open and pixel data is never decoded, so time and
+        memory stay flat regardless of image size. A PNG's EXIF is read only
+        when its eXIf chunk precedes the image data, since finding a later
+        one would make Pillow decode every pixel.
+        """
+        try:
+            with image.open() as stream, Image.open(stream) as picture:
+                if picture.format != 'PNG' or 'exif' in picture.info:
+                    exif = picture.getexif()
+                else:
+                    exif = Image.Exif()
+                exif_ifd = exif.get_ifd(ExifTags.IFD.Exif)
+                camera = {}
+                for key, tag in CAMERA_TAGS.items():
+                    value = self._tag_text(exif_ifd.get(tag, exif.get(tag)))
+                    if value:
+                        camera[key] = value
+                if 'software' not in camera and picture.info.get('Software'):
+                    # PNG text chunk
+                    camera['software'] = self._tag_text(picture.info['Software'])
+                return {
+                    'format': picture.format,
+                    'width': picture.width,
+                    'height': picture.height,
+                    'mode': picture.mode,
+                    'camera': camera,
+                    'gps': self._gps(exif.get_ifd(ExifTags.IFD.GPSInfo))
+                }
+        except Exception as e:
+            print(f"Image metadata error: {e}")
+            return {'error': str(e)}
+    
+    def _tag_text(self, value) -> Optional[str]:
+        if isinstance(value, bytes):
+            value = value.decode('utf-8', errors='ignore')
+        if not isinstance(value, str):
+            return None
+        return value.strip('\x00 ')[:MAX_TAG_LENGTH] or None
+    
+    def _gps(self, gps: Dict) -> Optional[Dict]:
+        """Decimal-degree position (and altitude in metres) from the GPS IFD"""
+        def degrees(values, ref) -> float:
+            d, m, s = (float(value) for value in values)
+            return (-1 if ref in ('S', 'W') else 1) * (d + m / 60 + s / 3600)
+        
+        try:
+            position = {
+                'latitude': degrees(gps[ExifTags.GPS.GPSLatitude], gps.get(ExifTags.GPS.GPSLatitudeRef)),
+                'longitude': degrees(gps[ExifTags.GPS.GPSLongitude], gps.get(ExifTags.GPS.GPSLongitudeRef))
+            }
+            if ExifTags.GPS.GPSAltitude in gps:
+                position['altitude'] = float(gps[ExifTags.GPS.GPSAltitude])
+        except (KeyError, TypeError, ValueError, ZeroDivisionError):
+            return None
+        if not all(math.isfinite(value) for value in position.values()):
+            return None
+        return {key: round(value, 6) for key, value in position.items()}
+    
+    def search_google_images(self, image: UploadedImage) -> List[Dict]:
         """Search Google Images"""
         results = []
         try:
@@ -43,7 +133,7 @@ class ImageSearch:
             print(f"Google Images search error: {e}")
         return results
     
-    def search_tineye(self, image_path: str) -> List[Dict]:
+    def search_tineye(self, image: UploadedImage) -> List[Dict]:
         """Search TinEye"""
         results = []
         try:
@@ -58,7 +148,7 @@ class ImageSearch:
             print(f"TinEye search error: {e}")
         return results
     
-    def search_yandex(self, image_path: str) -> List[Dict]:
+    def search_yandex(self, image: UploadedImage) -> List[Dict]:
         """Search Yandex Images"""
         results = []
         try:
@@ -73,12 +163,7 @@ class ImageSearch:
             print(f"Yandex search error: {e}")
         return results
     
-    def encode_image_base64(self, image_path: str) -> str:
-        """Encode image to base64"""
-        try:
-            with open(image_path, 'rb') as image_file:
-                return base64.b64encode(image_file.read()).decode('utf-8')
-        except Exception as e:
-            print(f"Image encoding error: {e}")
-            return ""
+    def encode_image_base64(self, image: UploadedImage) -> str:
+        """Encode image to base64 (computed once per upload)"""
+        return image.base64
 
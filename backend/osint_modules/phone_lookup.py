@@ -2,19 +2,54 @@
 Phone Number Lookup Module
 """
 
+import os
 import re
 import requests
-from typing import Dict, List
+from typing import Dict, Iterable, List
 import phonenumbers
-from phonenumbers import geocoder, carrier, timezone
+from phonenumbers import PhoneNumberType, geocoder, carrier, timezone
+
+from utils.cache import MemoryBackend
+from utils.http import get_session
+
+# phonenumbers reports the line type as an int; the API returns its name, e.g. "mobile"
+NUMBER_TYPES = {value: name.lower() for name, value in vars(PhoneNumberType).items()
+                if name.isupper() and isinstance(value, int)}
+
+# Example numbers run through the lookup to load a region's geocoder, carrier and timezone data
+WARM_UP_TYPES = (PhoneNumberType.FIXED_LINE, PhoneNumberType.MOBILE)
 
 class PhoneLookup:
     """Phone number lookup and analysis"""
     
-    def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+    def __init__(self, session: requests.Session = None, memo_size: int = None):
+        self.session = session or get_session()
+        # Parsed details of valid numbers keyed on their E.164 form; they never change at runtime
+        self.memo = MemoryBackend(memo_size or int(os.environ.get('PHONE_MEMO_SIZE', 4096)))
+    
+    def warm_up(self, regions: Iterable[str]):
+        """Load metadata for the given regions (e.g. "US", "GB") before the first real lookup"""
+        for region in regions:
+            for number_type in WARM_UP_TYPES:
+                example = phonenumbers.example_number_for_type(region.strip().upper(), number_type)
+                if example is not None:
+                    self.describe(example)
+    
+    def describe(self, parsed: phonenumbers.PhoneNumber) -> Dict:
+        """Formatting, region, carrier, timezones and line type of a valid number (memoized)"""
+        e164 = phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+        found, details = self.memo.get(e164)
+        if not found:
+            details = {
+                'e164_format': e164,
+                'formatted': phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.INTERNATIONAL),
+                'country': geocoder.description_for_number(parsed, "en"),
+                'carrier': carrier.name_for_number(parsed, "en"),
+                'timezone': list(timezone.time_zones_for_number(parsed)),
+                'type': NUMBER_TYPES.get(phonenumbers.number_type(parsed), 'unknown')
+            }
+            self.memo.set(e164, details, None)
+        return details
     
     def lookup(self, phone_number: str) -> Dict:
         """Lookup phone number information"""
@@ -34,11 +69,8 @@ class PhoneLookup:
             parsed = phonenumbers.parse(phone_number, None)
             if phonenumbers.is_valid_number(parsed):
                 results['valid'] = True
-                results['formatted'] = phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.INTERNATIONAL)
-                results['country'] = geocoder.description_for_number(parsed, "en")
-                results['carrier'] = carrier.name_for_number(parsed, "en")
-                results['timezone'] = timezone.time_zones_for_number(parsed)
-                results['type'] = phonenumbers.number_type(parsed)
+                details = self.describe(parsed)
+                results.update(details, timezone=list(details['timezone']))
                 
                 # Search public databases (example)
                 results['public_records'] = self.search_public_databases(phone_number)
@@ -0,0 +1,107 @@
+"""
+Provider Registry
+Search sources declared as metadata, imported and built only on first use
+"""
+
+import importlib
+import importlib.util
+import threading
+from typing import Dict, Iterable, List, Optional
+
+class ProviderDisabled(Exception):
+    """Raised when a provider is turned off by configuration or missing dependencies"""
+
+class ProviderSpec:
+    """Where a provider lives and what it needs, without importing it.
+
+    ``target`` is ``module:Class``; ``uses`` names the shared dependencies
+    (session, resolver, gmaps, circuits, ...) passed to the constructor as
+    keyword arguments; ``requires`` lists third-party packages that must be
+    importable for the provider to be offered.
+    """
+
+    def __init__(self, name: str, target: str, description: str = '',
+                 uses: Iterable[str] = (), requires: Iterable[str] = ()):
+        self.name = name
+        self.target = target
+        self.description = description
+        self.uses = tuple(uses)
+        self.requires = tuple(requires)
+
+    def missing_requirements(self) -> List[str]:
+        return [package for package in self.requires if importlib.util.find_spec(package) is None]
+
+DEFAULT_PROVIDERS = [
+    ProviderSpec('social_media', 'osint_modules.social_media:SocialMediaSearch',
+                 'Profile probes across social platforms', uses=('session',)),
+    ProviderSpec('image_search', 'osint_modules.image_search:ImageSearch',
+                 'Reverse image search links and image metadata', uses=('session',), requires=('PIL',)),
+    ProviderSpec('phone_lookup', 'osint_modules.phone_lookup:PhoneLookup',
+                 'Phone number parsing, carrier and region', uses=('session',), requires=('phonenumbers',)),
+    ProviderSpec('email_lookup', 'osint_modules.email_lookup:EmailLookup',
+                 'Email validation and domain DNS records', uses=('session', 'resolver'), requires=('dns',)),
+    ProviderSpec('address_lookup', 'osint_modules.address_lookup:AddressLookup',
+                 'Geocoding through Google Maps', uses=('session', 'gmaps', 'circuits')),
+    ProviderSpec('wifi_scanner', 'osint_modules.wifi_scanner:WiFiScanner',
+                 'Nearby WiFi networks (authorized use only)'),
+]
+
+class ProviderRegistry:
+    """Lazily imported, lazily constructed search providers"""
+
+    def __init__(self, dependencies: Dict = None, enabled: Optional[Iterable[str]] = None,
+                 specs: Iterable[ProviderSpec] = None):
+        self.dependencies = dependencies or {}
+        self.enabled = set(enabled) if enabled is not None else None
+        self.specs = {}
+        self._instances = {}
+        self._lock = threading.Lock()
+        for spec in DEFAULT_PROVIDERS if specs is None else specs:
+            self.register(spec)
+
+    def register(self, spec: ProviderSpec):
+        """Add or replace a provider; an already built instance is dropped"""
+        with self._lock:
+            self.specs[spec.name] = spec
+            self._instances.pop(spec.name, None)
+
+    def is_enabled(self, name: str) -> bool:
+        spec = self.specs.get(name)
+        if spec is None or (self.enabled is not None and name not in self.enabled):
+            return False
+        return not spec.missing_requirements()
+
+    def get(self, name: str):
+        """Return the provider instance, importing and building it on first use"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        if not self.is_enabled(name):
+            raise ProviderDisabled(f"Provider '{name}' is not enabled")
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                spec = self.specs[name]
+                module_path, _, class_name = spec.target.partition(':')
+                cls = getattr(importlib.import_module(module_path), class_name)
+                instance = self._instances[name] = cls(**{dep: self.dependencies.get(dep) for dep in spec.uses})
+        return instance
+
+    def loaded(self) -> List[str]:
+        with self._lock:
+            return sorted(self._instances)
+
+    def describe(self) -> Dict[str, Dict]:
+        """Per-provider metadata for /api/health"""
+        loaded = set(self.loaded())
+        result = {}
+        for name, spec in sorted(self.specs.items()):
+            missing = spec.missing_requirements()
+            result[name] = {
+                'description': spec.description,
+                'enabled': self.is_enabled(name),
+                'loaded': name in loaded
+            }
+            if missing:
+                result[name]['missing'] = missing
+        return result
@@ -3,129 +3,64 @@ Social Media OSINT Module
 Searches for profiles across multiple social media platforms
 """
 
+import os
 import requests
-from bs4 import BeautifulSoup
-import re
-import json
-from typing import Dict, List
+from functools import partial
+from typing import Callable, Dict, Iterable, List
+
+from osint_modules.social_platforms import PLATFORMS, Platform
+from utils.concurrency import FanOut
+from utils.http import get_session
+from utils.metrics import Metrics, get_metrics
 
 class SocialMediaSearch:
     """Search for social media profiles"""
     
-    def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    def __init__(self, session: requests.Session = None, max_workers: int = None, deadline: float = 12,
+                 metrics: Metrics = None, platforms: Iterable[str] = None):
+        self.session = session or get_session()
+        # Registered platforms to probe, optionally narrowed by SOCIAL_PLATFORMS
+        if platforms is None and os.environ.get('SOCIAL_PLATFORMS'):
+            platforms = [name.strip() for name in os.environ['SOCIAL_PLATFORMS'].split(',')]
+        self.platforms: Dict[str, Platform] = {
+            name: platform for name, platform in PLATFORMS.items()
+            if platforms is None or name in platforms
         }
+        self.metrics = metrics or get_metrics()
+        # Platform probes run concurrently, so a search takes about one round trip
+        # per catalog; whatever finishes by the deadline is returned
+        self.deadline = deadline
+        max_workers = max_workers or int(os.environ.get('SOCIAL_PROBE_WORKERS', 64))
+        self.probe_pool = FanOut(max_workers=max_workers, thread_name_prefix='social-probe',
+                                 observer=self.record_probe)
     
     def search(self, name: str) -> Dict[str, List[Dict]]:
-        """Search for social media profiles by name"""
-        results = {
-            'github': self.search_github(name),
-            'twitter': self.search_twitter(name),
-            'linkedin': self.search_linkedin(name),
-            'instagram': self.search_instagram(name),
-            'facebook': self.search_facebook(name),
-            'reddit': self.search_reddit(name),
-        }
-        return results
-    
-    def search_github(self, username: str) -> List[Dict]:
-        """Search GitHub profiles"""
-        results = []
-        try:
-            url = f"https://api.github.com/search/users?q={username}"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                for user in data.get('items', [])[:5]:
-                    results.append({
-                        'username': user.get('login'),
-                        'profile_url': user.get('html_url'),
-                        'avatar': user.get('avatar_url'),
-                        'type': user.get('type')
-                    })
-        except Exception as e:
-            print(f"GitHub search error: {e}")
-        return results
-    
-    def search_twitter(self, username: str) -> List[Dict]:
-        """Search Twitter/X profiles"""
-        results = []
-        try:
-            # Using web search as API requires authentication
-            url = f"https://twitter.com/{username}"
-            response = requests.get(url, headers=self.headers, timeout=10, allow_redirects=False)
-            if response.status_code == 200:
-                results.append({
-                    'username': username,
-                    'profile_url': url,
-                    'platform': 'Twitter/X'
-                })
-        except Exception as e:
-            print(f"Twitter search error: {e}")
-        return results
-    
-    def search_linkedin(self, name: str) -> List[Dict]:
-        """Search LinkedIn profiles"""
-        results = []
-        try:
-            # LinkedIn requires authentication, using public search
-            search_url = f"https://www.linkedin.com/pub/dir/?first={name.split()[0]}&last={name.split()[-1] if len(name.split()) > 1 else ''}"
-            results.append({
-                'name': name,
-                'search_url': search_url,
-                'platform': 'LinkedIn',
-                'note': 'LinkedIn requires login for full access'
-            })
-        except Exception as e:
-            print(f"LinkedIn search error: {e}")
+        """Search for social media profiles by name.
+
+        Platforms that were throttled, circuit-broken, timed out or failed
+        map to their outcome (``status``, ``error``) instead of a profile
+        list, so they are not mistaken for "no profile found".
+        """
+        results = {}
+        for platform, outcome in self.probe_pool.run(self.platform_probes(name), self.deadline).items():
+            if outcome['status'] == 'ok':
+                results[platform] = outcome['result']
+            else:
+                print(f"{platform} probe {outcome['status']} after {outcome['elapsed_ms']}ms")
+                results[platform] = outcome
         return results
     
-    def search_instagram(self, username: str) -> List[Dict]:
-        """Search Instagram profiles"""
-        results = []
-        try:
-            url = f"https://www.instagram.com/{username}/"
-            response = requests.get(url, headers=self.headers, timeout=10, allow_redirects=False)
-            if response.status_code == 200:
-                results.append({
-                    'username': username,
-                    'profile_url': url,
-                    'platform': 'Instagram'
-                })
-        except Exception as e:
-            print(f"Instagram search error: {e}")
-        return results
+    @staticmethod
+    def is_complete(results: Dict) -> bool:
+        """True when every platform answered, so the result is safe to cache"""
+        return all(isinstance(profiles, list) for profiles in results.values())
     
-    def search_facebook(self, name: str) -> List[Dict]:
-        """Search Facebook profiles"""
-        results = []
-        try:
-            # Facebook search URL
-            search_url = f"https://www.facebook.com/search/people/?q={name}"
-            results.append({
-                'name': name,
-                'search_url': search_url,
-                'platform': 'Facebook',
-                'note': 'Facebook requires login for full access'
-            })
-        except Exception as e:
-            print(f"Facebook search error: {e}")
-        return results
+    def record_probe(self, platform: str, outcome: Dict):
+        """Record a platform probe's outcome and latency"""
+        self.metrics.inc('osint_platform_calls_total', {'platform': platform, 'status': outcome['status']})
+        self.metrics.observe('osint_platform_seconds', outcome['elapsed_ms'] / 1000, {'platform': platform})
     
-    def search_reddit(self, username: str) -> List[Dict]:
-        """Search Reddit profiles"""
-        results = []
-        try:
-            url = f"https://www.reddit.com/user/{username}/"
-            response = requests.get(url, headers=self.headers, timeout=10, allow_redirects=False)
-            if response.status_code == 200:
-                results.append({
-                    'username': username,
-                    'profile_url': url,
-                    'platform': 'Reddit'
-                })
-        except Exception as e:
-            print(f"Reddit search error: {e}")
-        return results
-
+    def platform_probes(self, query: str) -> Dict[str, Callable[[], List[Dict]]]:
+        """One bound probe per platform, so callers can schedule them individually"""
+        return {name: partial(platform.probe, self.session, query)
+                for name, platform in self.platforms.items()}
@@ -0,0 +1,205 @@
+"""
+Social Media Platforms
+Platform checks declared as data and registered as plugins for SocialMediaSearch
+"""
+
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Tuple, Union
+
+import requests
+
+from utils.circuit import CircuitOpen
+from utils.http import read_prefix
+from utils.ratelimit import Throttled
+
+class Platform(ABC):
+    """One social platform probe.
+
+    Subclasses implement ``check``, returning ``[]`` only when the site
+    answered that there is no such profile. Anything that leaves the
+    question open (connection errors, timeouts, server errors, throttling,
+    unreadable answers) is raised, so the search reports the platform as
+    failed instead of caching a false "nothing found".
+    """
+
+    def __init__(self, name: str, label: str):
+        self.name = name
+        self.label = label
+
+    def probe(self, session: requests.Session, query: str) -> List[Dict]:
+        try:
+            return self.check(session, query)
+        except (Throttled, CircuitOpen):
+            raise
+        except Exception as e:
+            print(f"{self.label} search error: {e}")
+            raise
+
+    @abstractmethod
+    def check(self, session: requests.Session, query: str) -> List[Dict]:
+        """Profiles found for ``query``; raises when the site's answer settles nothing"""
+
+def raise_for_unsettled(response: requests.Response):
+    """Raise for a server error, which says nothing about whether a profile exists"""
+    if response.status_code >= 500:
+        response.close()
+        raise requests.HTTPError(f"{response.status_code} from {response.url}", response=response)
+
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), 'data', 'sites.json')
+
+# Handles most sites accept; entries can narrow it with username_pattern
+DEFAULT_USERNAME_PATTERN = r'^[A-Za-z0-9_.-]{1,64}$'
+
+# Body bytes read when a site has markers; entries can raise it with body_limit
+DEFAULT_BODY_LIMIT = 8 * 1024
+
+# HEAD answers meaning "use GET instead"
+HEAD_UNSUPPORTED = frozenset({405, 501})
+
+class CatalogSite(Platform):
+    """Username-presence check described by a site catalog entry.
+
+    The profile exists when ``url`` answers with one of ``status`` (without
+    redirecting, unless ``follow_redirects``), the body matches a
+    ``present`` marker if any are given, and matches no ``absent`` marker.
+    Handles that do not fit ``username_pattern`` are skipped without a
+    request.
+
+    Sites without markers are checked with HEAD (falling back to a GET
+    whose body is never read when HEAD is refused, or when ``head`` is
+    false). Sites with markers stream at most ``body_limit`` bytes and
+    stop as soon as the markers decide the answer.
+    """
+
+    def __init__(self, name: str, label: str, url: str, status: Union[int, Iterable[int]] = 200,
+                 present: Iterable[str] = (), absent: Iterable[str] = (), follow_redirects: bool = False,
+                 username_pattern: str = DEFAULT_USERNAME_PATTERN, profile_url: str = None,
+                 head: bool = True, body_limit: int = DEFAULT_BODY_LIMIT):
+        super().__init__(name, label)
+        self.url = url
+        self.profile_url = profile_url or url
+        self.statuses = frozenset([status] if isinstance(status, int) else status)
+        self.present = [re.compile(marker) for marker in present]
+        self.absent = [re.compile(marker) for marker in absent]
+        self.follow_redirects = follow_redirects
+        self.username_pattern = re.compile(username_pattern)
+        # Cleared the first time the site refuses HEAD, so later probes go straight to GET
+        self.head = head
+        self.body_limit = body_limit
+
+    @classmethod
+    def from_entry(cls, entry: Dict) -> 'CatalogSite':
+        try:
+            return cls(**entry)
+        except (TypeError, re.error) as e:
+            raise ValueError(f"Invalid site catalog entry {entry.get('name')!r}: {e}")
+
+    def check(self, session: requests.Session, username: str) -> List[Dict]:
+        if not self.username_pattern.match(username):
+            return []
+        if self.present or self.absent:
+            found = self._check_body(session, username)
+        else:
+            found = self._check_status(session, username)
+        if not found:
+            return []
+        return [{'username': username, 'profile_url': self.profile_url.format(username=username),
+                 'platform': self.label}]
+
+    def _check_status(self, session: requests.Session, username: str) -> bool:
+        url = self.url.format(username=username)
+        if self.head:
+            response = session.head(url, timeout=10, allow_redirects=self.follow_redirects)
+            response.close()
+            if response.status_code not in HEAD_UNSUPPORTED:
+                raise_for_unsettled(response)
+                return response.status_code in self.statuses
+            self.head = False
+        response = session.get(url, timeout=10, allow_redirects=self.follow_redirects, stream=True)
+        read_prefix(response, 0)
+        raise_for_unsettled(response)
+        return response.status_code in self.statuses
+
+    def _check_body(self, session: requests.Session, username: str) -> bool:
+        response = session.get(self.url.format(username=username), timeout=10,
+                               allow_redirects=self.follow_redirects, stream=True)
+        raise_for_unsettled(response)
+        if response.status_code not in self.statuses:
+            read_prefix(response, 0)
+            return False
+        body = read_prefix(response, self.body_limit, stop=self._decided).decode(
+            response.encoding or 'utf-8', errors='ignore')
+        if any(marker.search(body) for marker in self.absent):
+            return False
+        return not self.present or any(marker.search(body) for marker in self.present)
+
+    def _decided(self, body: bytes) -> bool:
+        """True once the bytes read so far settle the markers"""
+        text = body.decode('utf-8', errors='ignore')
+        if any(marker.search(text) for marker in self.absent):
+            return True
+        # A present marker only settles it when there is no absent marker left to rule out
+        return not self.absent and any(marker.search(text) for marker in self.present)
+
+def load_catalog(path: str = None) -> List[CatalogSite]:
+    """Parse and compile the site catalog (SITE_CATALOG overrides the bundled one)"""
+    with open(path or os.environ.get('SITE_CATALOG', CATALOG_PATH)) as f:
+        catalog = json.load(f)
+    return [CatalogSite.from_entry(entry) for entry in catalog['sites']]
+
+class SearchLink(Platform):
+    """Platforms that need a login: return a people-search link without any request"""
+
+    def __init__(self, name: str, label: str, url_for: Callable[[str], str], note: str):
+        super().__init__(name, label)
+        self.url_for = url_for
+        self.note = note
+
+    def check(self, session: requests.Session, name: str) -> List[Dict]:
+        return [{'name': name, 'search_url': self.url_for(name), 'platform': self.label, 'note': self.note}]
+
+class JSONUserSearch(Platform):
+    """User search APIs returning ``{items: [...]}``; ``fields`` maps result keys to item keys"""
+
+    def __init__(self, name: str, label: str, url: str, fields: Dict[str, str], limit: int = 5):
+        super().__init__(name, label)
+        self.url = url
+        self.fields = fields
+        self.limit = limit
+
+    def check(self, session: requests.Session, query: str) -> List[Dict]:
+        response = session.get(self.url.format(query=query), timeout=10)
+        if response.status_code == 422:
+            # The API refused the query itself (e.g. characters it cannot search for)
+            return []
+        response.raise_for_status()
+        return [{key: item.get(field) for key, field in self.fields.items()}
+                for item in response.json().get('items', [])[:self.limit]]
+
+def _name_parts(name: str) -> Tuple[str, str]:
+    parts = name.split()
+    return parts[0], parts[-1] if len(parts) > 1 else ''
+
+PLATFORMS: Dict[str, Platform] = {}
+
+def register_platform(platform: Platform):
+    """Make a platform available to SocialMediaSearch (replacing one of the same name)"""
+    PLATFORMS[platform.name] = platform
+
+for _platform in (
+    JSONUserSearch('github', 'GitHub', 'https://api.github.com/search/users?q={query}',
+                   fields={'username': 'login', 'profile_url': 'html_url', 'avatar': 'avatar_url', 'type': 'type'}),
+    SearchLink('linkedin', 'LinkedIn',
+               lambda name: 'https://www.linkedin.com/pub/dir/?first={}&last={}'.format(*_name_parts(name)),
+               'LinkedIn requires login for full access'),
+    SearchLink('facebook', 'Facebook', lambda name: f'https://www.facebook.com/search/people/?q={name}',
+               'Facebook requires login for full access'),
+):
+    register_platform(_platform)
+
+# The catalog is read and its markers compiled once per process, when this module is first imported
+for _platform in load_catalog():
+    register_platform(_platform)
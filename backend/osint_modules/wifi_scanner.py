@@ -3,19 +3,75 @@ WiFi Network Scanner Module
 Note: Requires proper authorization and may be platform-specific
 """
 
+import os
+import shutil
 import subprocess
 import platform
 import re
-from typing import Dict, List
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List
+
+# nmcli fields requested, in output order, and the keys they are returned under
+NMCLI_FIELDS = {
+    'SSID': 'ssid',
+    'BSSID': 'bssid',
+    'SIGNAL': 'signal',
+    'CHAN': 'channel',
+    'SECURITY': 'security',
+}
+
+def split_terse(line: str) -> List[str]:
+    """Split one line of ``nmcli -t`` output on unescaped colons.
+
+    nmcli escapes ``:`` and ``\\`` inside values with a backslash (an SSID
+    like ``a:b`` or any BSSID), so a plain ``split(':')`` misreads them.
+    """
+    fields, current = [], []
+    chars = iter(line)
+    for char in chars:
+        if char == '\\':
+            current.append(next(chars, ''))
+        elif char == ':':
+            fields.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    fields.append(''.join(current))
+    return fields
+
+def parse_nmcli(lines: Iterable[str], fields: Iterable[str] = tuple(NMCLI_FIELDS)) -> Iterator[Dict[str, str]]:
+    """Parse ``nmcli -t`` output line by line as it is produced"""
+    fields = list(fields)
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line:
+            continue
+        values = split_terse(line)
+        if len(values) == len(fields):
+            yield dict(zip(fields, values))
 
 class WiFiScanner:
-    """WiFi network scanning (requires authorization)"""
+    """WiFi network scanning (requires authorization).
+
+    Scans run on a background thread every ``interval`` seconds; requests
+    are answered from the latest snapshot along with its age. An interval
+    of 0 scans on every request instead.
+    """
     
-    def __init__(self):
+    def __init__(self, interval: float = None, timeout: float = 10):
         self.system = platform.system()
+        self.interval = float(os.environ.get('WIFI_SCAN_INTERVAL', 30)) if interval is None else interval
+        self.timeout = timeout
+        self.snapshot = None
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
     
-    def scan(self, location: str = None) -> Dict:
-        """Scan for WiFi networks"""
+    def scan(self, location: str = None, limit: int = 10) -> Dict:
+        """Nearby WiFi networks, strongest first, from the latest snapshot"""
         results = {
             'networks': [],
             'location': location,
@@ -23,6 +79,28 @@ class WiFiScanner:
             'note': 'WiFi scanning requires proper authorization and may be restricted'
         }
         
+        if self.interval > 0:
+            self._start()
+            self._ready.wait(self.timeout)
+            snapshot = self.snapshot
+        else:
+            snapshot = self.refresh()
+        if snapshot is None:
+            results['error'] = 'The first WiFi scan has not finished yet'
+            return results
+        
+        results['networks'] = snapshot['networks'][:limit]
+        results['total'] = len(snapshot['networks'])
+        results['scanned_at'] = snapshot['scanned_at']
+        results['age_s'] = round(time.monotonic() - snapshot['monotonic'], 1)
+        if 'error' in snapshot:
+            results['error'] = snapshot['error']
+            results['note'] = 'WiFi scanning may require elevated permissions'
+        return results
+    
+    def refresh(self) -> Dict:
+        """Run one platform scan and publish it as the current snapshot"""
+        snapshot = {'networks': [], 'scanned_at': datetime.now().isoformat(), 'monotonic': time.monotonic()}
         try:
             if self.system == 'Linux':
                 networks = self.scan_linux()
@@ -33,34 +111,63 @@ class WiFiScanner:
             else:
                 networks = []
             
-            results['networks'] = networks
+            snapshot['networks'] = networks
         except Exception as e:
-            results['error'] = str(e)
-            results['note'] = 'WiFi scanning may require elevated permissions'
+            snapshot['error'] = str(e)
         
-        return results
+        self.snapshot = snapshot
+        self._ready.set()
+        return snapshot
+    
+    def stop(self):
+        self._stopped.set()
+    
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='wifi-scan', daemon=True)
+                    self._thread.start()
+    
+    def _run(self):
+        while not self._stopped.is_set():
+            self.refresh()
+            self._stopped.wait(self.interval)
     
     def scan_linux(self) -> List[Dict]:
-        """Scan WiFi on Linux using nmcli or iwlist"""
+        """Scan WiFi on Linux using nmcli (found on PATH), parsing its output as it streams"""
         networks = []
+        nmcli = shutil.which('nmcli')
+        if nmcli is None:
+            print("Linux WiFi scan error: nmcli not found on PATH")
+            return networks
         try:
-            # Try nmcli first (NetworkManager)
-            result = subprocess.run(['nmcli', '-t', '-f', 'SSID,SIGNAL,SECURITY', 'device', 'wifi', 'list'],
-                                  capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                for line in result.stdout.strip().split('\n'):
-                    if line:
-                        parts = line.split(':')
-                        if len(parts) >= 3:
-                            networks.append({
-                                'ssid': parts[0],
-                                'signal': parts[1],
-                                'security': parts[2]
-                            })
+            process = subprocess.Popen(
+                [nmcli, '-t', '--escape', 'yes', '-f', ','.join(NMCLI_FIELDS), 'device', 'wifi', 'list'],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+            # A hung nmcli is killed, which ends the output and the parse with it
+            watchdog = threading.Timer(self.timeout, process.kill)
+            watchdog.start()
+            try:
+                for fields in parse_nmcli(process.stdout):
+                    networks.append(self._network(fields))
+                process.wait()
+            finally:
+                watchdog.cancel()
+                process.stdout.close()
+            if process.returncode != 0:
+                print(f"Linux WiFi scan error: nmcli exited with {process.returncode}")
+                return []
         except Exception as e:
             print(f"Linux WiFi scan error: {e}")
         
-        return networks[:10]  # Limit to 10 networks
+        return sorted(networks, key=lambda network: network['signal'] or 0, reverse=True)
+    
+    def _network(self, fields: Dict[str, str]) -> Dict:
+        network = {NMCLI_FIELDS[field]: value for field, value in fields.items()}
+        for key in ('signal', 'channel'):
+            network[key] = int(network[key]) if network[key].isdigit() else None
+        return network
     
     def scan_macos(self) -> List[Dict]:
         """Scan WiFi on macOS using airport command"""
@@ -85,7 +192,7 @@ class WiFiScanner:
         except Exception as e:
             print(f"macOS WiFi scan error: {e}")
         
-        return networks[:10]
+        return networks
     
     def scan_windows(self) -> List[Dict]:
         """Scan WiFi on Windows using netsh"""
@@ -105,5 +212,5 @@ class WiFiScanner:
         except Exception as e:
             print(f"Windows WiFi scan error: {e}")
         
-        return networks[:10]
+        return networks
 
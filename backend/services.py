@@ -0,0 +1,298 @@
+"""
+OSINTZeUS Services
+Wires the OSINT providers to the shared infrastructure of one application instance
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from osint_modules.registry import ProviderRegistry
+from utils.report_generator import ReportAggregator, ReportGenerator
+from utils.report_store import ReportStore
+from utils.concurrency import FanOut
+from utils.http import get_session
+from utils.cache import MemoryBackend, ResultCache, SQLiteBackend, make_backend
+from utils.circuit import get_circuit_board
+from utils.singleflight import SingleFlight
+from utils.history import HistoryStore
+from utils.jobs import Job, JobManager
+from utils.uploads import UploadedImage
+from utils.metrics import get_metrics
+
+if TYPE_CHECKING:
+    from utils.resolver import CachingResolver
+
+class Services:
+    """OSINT modules plus the pools, caches and job queue they share"""
+
+    def __init__(self, config: Dict, http_session: requests.Session = None,
+                 dns_resolver: 'CachingResolver' = None, gmaps=None):
+        self.config = config
+        self.metrics = get_metrics()
+
+        # All outbound HTTP shares one pooled session; overrides let the
+        # benchmark harness point every module at local stand-in providers
+        self.http_session = http_session or get_session()
+        # None leaves the DNS resolver (and its thread pool) to the email provider, built on first use
+        self.dns_resolver = dns_resolver
+        self.circuits = getattr(self.http_session, 'circuits', None) or get_circuit_board()
+
+        # Providers are imported and built on first use, so deployments only
+        # pay for the sources they actually call
+        enabled = config.get('PROVIDERS')
+        self.providers = ProviderRegistry(
+            dependencies={'session': self.http_session, 'resolver': self.dns_resolver,
+                          'gmaps': gmaps, 'circuits': self.circuits},
+            enabled=[name.strip() for name in enabled.split(',')] if enabled else None
+        )
+        self.report_generator = ReportGenerator()
+        self.report_store = ReportStore(
+            config['REPORT_FOLDER'],
+            codec=config['REPORT_COMPRESSION'],
+            max_reports=config['REPORT_MAX_COUNT'],
+            max_age=config['REPORT_MAX_AGE_DAYS'] * 86400
+        )
+
+        self.fan_out = FanOut(max_workers=config['FANOUT_WORKERS'], observer=self.record_call)
+        self.result_cache = ResultCache(make_backend(
+            config['CACHE_BACKEND'],
+            path=config['CACHE_PATH'],
+            max_entries=config['CACHE_MAX_ENTRIES']
+        ), metrics=self.metrics)
+        self.search_flights = SingleFlight()
+        self.job_manager = JobManager(
+            self.fan_out,
+            max_workers=config['JOB_WORKERS'],
+            max_queued=config['JOB_QUEUE_DEPTH'],
+            on_finish=self.record_job
+        )
+
+        # Finished searches are kept for a while so reports can be generated from a search_id.
+        # The worker that ran a search answers from memory, aggregate included; the search is
+        # also copied to SQLite so other workers can find it (and recompute the aggregate)
+        self.retained_searches = MemoryBackend(config['RESULT_RETENTION_MAX'])
+        self.retained_store = None
+        if config.get('RESULT_STORE_PATH'):
+            self.retained_store = SQLiteBackend(config['RESULT_STORE_PATH'], config['RESULT_RETENTION_MAX'])
+
+        # Search history and shared retained searches are written by one background thread
+        # so requests never wait on SQLite
+        self.history = HistoryStore(config['HISTORY_PATH']) if config.get('HISTORY_PATH') else None
+        self.store_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='store-writer')
+
+        # Earlier image searches answer near-duplicate uploads; the index (with NumPy and
+        # Pillow) is opened by the first image search
+        self._image_index = None
+        self._image_index_lock = threading.Lock()
+
+        # Phone metadata for the configured regions loads in the background instead of on the first lookup
+        regions = config.get('PHONE_WARM_REGIONS')
+        if regions and self.providers.is_enabled('phone_lookup'):
+            threading.Thread(target=self.warm_up_phone, args=(regions.split(','),),
+                             name='phone-warm-up', daemon=True).start()
+
+    @property
+    def social_media(self):
+        return self.providers.get('social_media')
+
+    @property
+    def image_search(self):
+        return self.providers.get('image_search')
+
+    @property
+    def phone_lookup(self):
+        return self.providers.get('phone_lookup')
+
+    @property
+    def email_lookup(self):
+        return self.providers.get('email_lookup')
+
+    @property
+    def address_lookup(self):
+        return self.providers.get('address_lookup')
+
+    @property
+    def wifi_scanner(self):
+        return self.providers.get('wifi_scanner')
+
+    @property
+    def image_index(self):
+        """The near-duplicate image index, opened on first use; None when disabled"""
+        if self._image_index is None and self.config.get('IMAGE_INDEX_PATH') \
+                and self.providers.is_enabled('image_search'):
+            with self._image_index_lock:
+                if self._image_index is None:
+                    from utils.image_index import ImageIndex
+                    self._image_index = ImageIndex(self.config['IMAGE_INDEX_PATH'],
+                                                   self.config['IMAGE_MATCH_DISTANCE'])
+        return self._image_index
+
+    def run_lookup(self, module: str, query: str, fn: Callable, bypass: bool = False,
+                   cacheable: Callable = None):
+        """Run a module call through the result cache, coalescing identical in-flight calls"""
+        key = self.result_cache.key(module, query)
+        compute = partial(self.search_flights.do, key, partial(fn, query), label=module)
+        return self.result_cache.get_or_compute(module, query, compute, bypass=bypass, cacheable=cacheable)
+
+    def lookup_now(self, module: str, query: str, fn: Callable, bypass: bool = False,
+                   cacheable: Callable = None):
+        """run_lookup on the calling thread, recording it like a fan-out call"""
+        start = time.monotonic()
+        try:
+            result = self.run_lookup(module, query, fn, bypass, cacheable)
+        except Exception as e:
+            self.record_call(module, {'status': 'error', 'error': str(e),
+                                      'elapsed_ms': int((time.monotonic() - start) * 1000)})
+            raise
+        self.record_call(module, {'status': 'ok', 'elapsed_ms': int((time.monotonic() - start) * 1000)})
+        return result
+
+    def search_image(self, image: UploadedImage, search_id: str, bypass: bool = False) -> Tuple[Dict, Optional[Dict]]:
+        """Reverse search an upload, answering near-duplicates of earlier uploads from the image index.
+
+        Returns the engine results and, when they came from the index, the
+        match (closest search_id, distance in bits and every matching search_id).
+        """
+        self.image_search.check_size(image)
+        image_index = self.image_index
+        if image_index is None:
+            return self.image_search.reverse_search(image), None
+        try:
+            with image.open() as stream:
+                phash, dhash = image_index.hashes(stream)
+        except Exception as e:
+            print(f"Image hash error: {e}")
+            self.metrics.inc('osint_image_index_total', {'result': 'unhashable'})
+            return self.image_search.reverse_search(image), None
+        if not bypass:
+            match = image_index.lookup(image.sha256, phash, dhash)
+            if match is not None:
+                self.metrics.inc('osint_image_index_total', {'result': 'hit'})
+                # A near-duplicate shares engine results, not the metadata of this particular file
+                results = match.pop('results')
+                results['metadata'] = self.image_search.extract_metadata(image)
+                return results, match
+        self.metrics.inc('osint_image_index_total', {'result': 'miss'})
+        results = self.image_search.reverse_search(image)
+        image_index.add(search_id, image.sha256, phash, dhash, results)
+        return results, None
+
+    def warm_up_phone(self, regions: List[str]):
+        """Import phonenumbers and load its metadata for ``regions`` (runs on a background thread)"""
+        start = time.perf_counter()
+        try:
+            self.phone_lookup.warm_up(regions)
+            print(f"Phone metadata warmed for {','.join(regions)} in {time.perf_counter() - start:.2f}s")
+        except Exception as e:
+            print(f"Phone warm-up error: {e}")
+
+    def record_call(self, name: str, outcome: Dict):
+        """Record a module (or 'social_media:<platform>' probe) outcome and latency.
+
+        Other '<module>:<part>' calls, such as streamed email sections, are parts
+        of one module call that the caller records under the module itself.
+        """
+        module, _, part = name.partition(':')
+        if part:
+            if module == 'social_media':
+                self.social_media.record_probe(part, outcome)
+            return
+        self.metrics.inc('osint_module_calls_total', {'module': module, 'status': outcome['status']})
+        self.metrics.observe('osint_module_seconds', outcome['elapsed_ms'] / 1000, {'module': module})
+
+    def health(self) -> Dict:
+        """Per-module, per-platform and per-host call summaries"""
+        return {
+            'uptime_s': int(time.time() - self.metrics.started),
+            'modules': self.metrics.summary('osint_module_calls_total', 'osint_module_seconds', 'module'),
+            'platforms': self.metrics.summary('osint_platform_calls_total', 'osint_platform_seconds', 'platform'),
+            'outbound': self.metrics.summary('osint_outbound_requests_total', 'osint_outbound_seconds', 'host'),
+            'throttling': self.http_session.scheduler.stats() if hasattr(self.http_session, 'scheduler') else {},
+            'circuits': self.circuits.stats(),
+            'providers': self.providers.describe(),
+            'history': {'searches': self.history.count()} if self.history is not None else None,
+            'retained_searches': len(self.retained_searches),
+            'image_index': self._image_index.stats() if self._image_index is not None else None,
+            'reports': self.report_store.stats(),
+        }
+
+    def record_search(self, search_id: str, kind: str, query: str, results: Dict,
+                      aggregator: ReportAggregator = None):
+        """Retain a finished search for reports and queue it for the shared and history stores"""
+        search = {'search_id': search_id, 'type': kind, 'query': query, 'results': results}
+        self.retained_searches.set(search_id, (search, aggregator), self.config['RESULT_RETENTION'])
+        try:
+            if self.retained_store is not None:
+                self.store_writer.submit(self._write_retained, search_id, search)
+            if self.history is not None:
+                self.store_writer.submit(self._write_history, search_id, kind, query, results)
+        except RuntimeError as e:
+            print(f"Search store write skipped: {e}")
+
+    def retained_search(self, search_id: str) -> Optional[Tuple[Dict, Optional[ReportAggregator]]]:
+        """Results of a recent search and their aggregate if this worker kept one, or None once expired"""
+        found, retained = self.retained_searches.get(search_id)
+        if found:
+            return retained
+        if self.retained_store is None:
+            return None
+        # Run by another worker: only the results are shared
+        found, search = self.retained_store.get(search_id)
+        return (search, None) if found else None
+
+    def record_job(self, job: Job):
+        self.record_search(job.search_id, job.kind, job.query, dict(job.results), job.report)
+
+    def _write_retained(self, search_id: str, search: Dict):
+        try:
+            self.retained_store.set(search_id, search, self.config['RESULT_RETENTION'])
+        except Exception as e:
+            print(f"Retained search write error: {e}")
+
+    def _write_history(self, search_id: str, kind: str, query: str, results: Dict):
+        try:
+            self.history.record(search_id, kind, query, results)
+        except Exception as e:
+            print(f"History write error: {e}")
+
+    def cached_call(self, module: str, query: str, fn: Callable, bypass: bool = False,
+                    cacheable: Callable = None) -> Callable:
+        """Bind run_lookup for later execution on the fan-out pool"""
+        return partial(self.run_lookup, module, query, fn, bypass, cacheable)
+
+    def build_name_calls(self, name: str, options: Dict, bypass: bool = False) -> Dict[str, Callable]:
+        """Module calls for a name search, keyed by their results section (disabled providers are skipped)"""
+        calls = {}
+        enabled = self.providers.is_enabled
+
+        # Social media search
+        if options.get('social_media', True) and enabled('social_media'):
+            calls['social_media'] = self.cached_call('social_media', name, self.social_media.search, bypass,
+                                                     cacheable=self.social_media.is_complete)
+
+        # Email search
+        if options.get('email', True) and enabled('email_lookup'):
+            calls['emails'] = self.cached_call('emails', name, self.email_lookup.search_by_name, bypass)
+
+        # Phone search
+        if options.get('phone', True) and enabled('phone_lookup'):
+            calls['phones'] = self.cached_call('phones', name, self.phone_lookup.search_by_name, bypass)
+
+        # Address search
+        if options.get('address', True) and enabled('address_lookup'):
+            calls['addresses'] = self.cached_call('addresses', name, self.address_lookup.search_by_name, bypass)
+
+        return calls
+
+    def shutdown(self):
+        """Stop worker pools so in-flight work drains before the process exits"""
+        self.job_manager.shutdown()
+        self.fan_out.shutdown(wait=False)
+        self.store_writer.shutdown(wait=True)
+        if 'wifi_scanner' in self.providers.loaded():
+            self.wifi_scanner.stop()
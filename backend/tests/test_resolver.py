@@ -0,0 +1,102 @@
+"""
+Resolver Tests
+Drive CachingResolver against the local stub DNS server
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.stubs import Behaviour, StubDNSServer
+from utils.resolver import CachingResolver
+
+@pytest.fixture
+def dns_stub():
+    """A running stub DNS server for example.com; returns a function building resolvers for it"""
+    stub = StubDNSServer(['example.com'], behaviour=Behaviour(latency_ms=5, jitter_ms=0)).start()
+
+    def resolver(**kwargs) -> CachingResolver:
+        kwargs.setdefault('timeout', 1.0)
+        return CachingResolver(['127.0.0.1'], port=stub.port, **kwargs)
+
+    resolver.stub = stub
+    yield resolver
+    stub.stop()
+
+def test_answers_are_cached_for_their_ttl(dns_stub):
+    dns_stub.stub.ttl = 1
+    resolver = dns_stub()
+
+    first = resolver.resolve('example.com', 'MX')
+    assert sorted(first['records']) == ['mx1.example.com.', 'mx2.example.com.']
+    assert first['ttl'] == 1
+    assert resolver.resolve('EXAMPLE.com.', 'mx') == first
+    assert dns_stub.stub.queries == 1
+
+    time.sleep(1.1)
+    assert sorted(resolver.resolve('example.com', 'MX')['records']) == sorted(first['records'])
+    assert dns_stub.stub.queries == 2
+
+def test_ttl_is_capped_by_max_ttl(dns_stub):
+    resolver = dns_stub(max_ttl=60)
+    assert resolver.resolve('example.com', 'A') == {
+        'name': 'example.com', 'type': 'A', 'records': ['192.0.2.10'], 'ttl': 60
+    }
+
+@pytest.mark.parametrize('name, rdtype, error', [
+    ('missing.example.com', 'A', 'NXDOMAIN'),
+    ('_dmarc.example.com', 'MX', 'NoAnswer'),
+])
+def test_negative_answers_are_cached(dns_stub, name, rdtype, error):
+    resolver = dns_stub(negative_ttl=60)
+
+    entry = resolver.resolve(name, rdtype)
+    assert entry['error'] == error
+    assert entry['records'] == []
+    assert resolver.resolve(name, rdtype) == entry
+    assert dns_stub.stub.queries == 1
+
+def test_server_failures_are_not_cached(dns_stub):
+    resolver = dns_stub()
+    dns_stub.stub.behaviour.error_rate = 1.0
+
+    assert 'error' in resolver.resolve('example.com', 'A')
+    assert resolver.stats()['entries'] == 0
+
+    dns_stub.stub.behaviour.error_rate = 0.0
+    entry = resolver.resolve('example.com', 'A')
+    assert 'error' not in entry
+    assert entry['records'] == ['192.0.2.10']
+
+def test_timeouts_are_not_cached(dns_stub):
+    resolver = dns_stub(timeout=0.2)
+    dns_stub.stub.behaviour.latency_ms = 500
+
+    assert 'error' in resolver.resolve('example.com', 'AAAA')
+    assert resolver.stats()['entries'] == 0
+
+    dns_stub.stub.behaviour.latency_ms = 5
+    assert resolver.resolve('example.com', 'AAAA')['records'] == ['2001:db8::10']
+
+def test_concurrent_identical_queries_share_one_lookup(dns_stub):
+    resolver = dns_stub()
+    dns_stub.stub.behaviour.latency_ms = 200
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        entries = list(pool.map(lambda _: resolver.resolve('example.com', 'TXT'), range(8)))
+
+    assert all(entry['records'] == ['v=spf1 include:_spf.example.com -all'] for entry in entries)
+    assert dns_stub.stub.queries == 1
+
+def test_resolve_many_answers_every_query(dns_stub):
+    resolver = dns_stub()
+    answers = resolver.resolve_many([
+        ('example.com', 'MX'),
+        ('_dmarc.example.com', 'TXT'),
+        ('missing.example.com', 'A'),
+    ])
+
+    assert sorted(answers[('example.com', 'MX')]['records']) == ['mx1.example.com.', 'mx2.example.com.']
+    assert answers[('_dmarc.example.com', 'TXT')]['records'] == ['v=DMARC1; p=reject']
+    assert answers[('missing.example.com', 'A')]['error'] == 'NXDOMAIN'
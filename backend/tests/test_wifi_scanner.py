@@ -0,0 +1,106 @@
+"""
+WiFi Scanner Tests
+Drive the Linux scan through a fake nmcli placed first on PATH
+"""
+
+import os
+import stat
+import time
+
+import pytest
+
+from osint_modules.wifi_scanner import WiFiScanner, parse_nmcli, split_terse
+
+# Escaped nmcli -t output: SSID, BSSID, SIGNAL, CHAN, SECURITY
+NMCLI_OUTPUT = r"""cafe\:wifi:AA\:BB\:CC\:DD\:EE\:01:40:6:WPA2
+back\\slash:AA\:BB\:CC\:DD\:EE\:02:90:11:WPA2
+plain:AA\:BB\:CC\:DD\:EE\:03:75:1:
+hidden\:\\\::AA\:BB\:CC\:DD\:EE\:04:10:36:WPA3
+weak:AA\:BB\:CC\:DD\:EE\:05:--:149:WPA2
+"""
+
+@pytest.fixture
+def fake_nmcli(tmp_path, monkeypatch):
+    """Install an nmcli script on PATH; returns a function setting its body and counting calls"""
+    script = tmp_path / 'nmcli'
+    calls = tmp_path / 'calls'
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ.get('PATH', '')}")
+
+    def install(body: str):
+        script.write_text(f"#!/bin/sh\necho called >> '{calls}'\n{body}\n")
+        script.chmod(script.stat().st_mode | stat.S_IXUSR)
+
+    install.calls = lambda: len(calls.read_text().splitlines()) if calls.exists() else 0
+    install.output = tmp_path / 'output.txt'
+    install.output.write_text(NMCLI_OUTPUT)
+    return install
+
+def linux_scanner(**kwargs) -> WiFiScanner:
+    scanner = WiFiScanner(**kwargs)
+    scanner.system = 'Linux'
+    return scanner
+
+def test_split_terse_unescapes_colons_and_backslashes():
+    assert split_terse(r'cafe\:wifi:AA\:BB:40') == ['cafe:wifi', 'AA:BB', '40']
+    assert split_terse(r'back\\slash:x') == ['back\\slash', 'x']
+    assert split_terse(r'a\\:b') == ['a\\', 'b']
+    assert split_terse('ssid::') == ['ssid', '', '']
+
+def test_parse_nmcli_skips_blank_and_malformed_lines():
+    lines = [r'a\:b:AA\:BB:50:6:WPA2' + '\n', '\n', 'too:few\n']
+    assert list(parse_nmcli(lines)) == [
+        {'SSID': 'a:b', 'BSSID': 'AA:BB', 'SIGNAL': '50', 'CHAN': '6', 'SECURITY': 'WPA2'}
+    ]
+
+def test_scan_linux_parses_escaped_output_strongest_first(fake_nmcli):
+    fake_nmcli(f"cat '{fake_nmcli.output}'")
+    networks = linux_scanner(interval=0).scan_linux()
+
+    assert [network['ssid'] for network in networks] == ['back\\slash', 'plain', 'cafe:wifi', 'hidden:\\:', 'weak']
+    assert networks[0] == {'ssid': 'back\\slash', 'bssid': 'AA:BB:CC:DD:EE:02', 'signal': 90,
+                           'channel': 11, 'security': 'WPA2'}
+    assert networks[-1]['signal'] is None
+
+def test_scan_limit_keeps_the_strongest(fake_nmcli):
+    fake_nmcli(f"cat '{fake_nmcli.output}'")
+    results = linux_scanner(interval=0).scan(limit=2)
+
+    assert [network['signal'] for network in results['networks']] == [90, 75]
+    assert results['total'] == 5
+
+def test_scan_reports_snapshot_age_without_rescanning(fake_nmcli):
+    fake_nmcli(f"cat '{fake_nmcli.output}'")
+    scanner = linux_scanner(interval=60, timeout=5)
+    try:
+        first = scanner.scan()
+        assert first['age_s'] < 1
+        assert first['total'] == 5
+
+        scanner.snapshot['monotonic'] -= 42
+        second = scanner.scan()
+        assert 42 <= second['age_s'] < 43
+        assert second['scanned_at'] == first['scanned_at']
+        assert fake_nmcli.calls() == 1
+    finally:
+        scanner.stop()
+
+def test_scan_without_snapshot_age_rescans_each_request(fake_nmcli):
+    fake_nmcli(f"cat '{fake_nmcli.output}'")
+    scanner = linux_scanner(interval=0)
+    scanner.scan()
+    scanner.scan()
+    assert fake_nmcli.calls() == 2
+
+def test_watchdog_kills_hung_nmcli(fake_nmcli):
+    # Print one network, then hang with the pipe still open
+    fake_nmcli(f"head -n 1 '{fake_nmcli.output}'\nexec sleep 30")
+    scanner = linux_scanner(interval=0, timeout=0.5)
+
+    start = time.monotonic()
+    networks = scanner.scan_linux()
+    assert time.monotonic() - start < 5
+    assert networks == []
+
+def test_nonzero_exit_discards_output(fake_nmcli):
+    fake_nmcli(f"cat '{fake_nmcli.output}'\nexit 8")
+    assert linux_scanner(interval=0).scan_linux() == []
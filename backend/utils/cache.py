@@ -0,0 +1,216 @@
+"""
+Result Cache
+TTL + LRU cache for OSINT lookups with pluggable storage backends
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from utils.metrics import Metrics, get_metrics
+
+# Seconds each module's results stay fresh. Profile-existence probes change
+# often; phonenumbers metadata only changes with a library upgrade.
+DEFAULT_TTLS = {
+    'social_media': 10 * 60,
+    'emails': 60 * 60,
+    'phones': 60 * 60,
+    'addresses': 24 * 60 * 60,
+    'email': 60 * 60,
+    'phone': 7 * 24 * 60 * 60,
+}
+DEFAULT_TTL = 5 * 60
+
+class MemoryBackend:
+    """In-process LRU store with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value) for an unexpired entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value: Any, ttl: Optional[float]):
+        """Store a value, evicting the least recently used entries when full"""
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SQLiteBackend:
+    """SQLite store so cached results survive restarts"""
+
+    def __init__(self, path: str = 'cache/results.db', max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+            'expires_at REAL, accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (accessed_at)')
+        self._conn.commit()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value) for an unexpired entry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, expires_at FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return False, None
+            if row[1] is not None and row[1] <= now:
+                self._conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+                self._conn.commit()
+                return False, None
+            self._conn.execute('UPDATE cache SET accessed_at = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+        return True, json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float]):
+        """Store a value, evicting the least recently used entries when full"""
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value, default=str), expires_at, now)
+            )
+            self._conn.execute(
+                'DELETE FROM cache WHERE key IN ('
+                'SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM cache')
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+def make_backend(kind: str = 'memory', path: str = None, max_entries: int = None):
+    """Build a cache backend by name ('memory' or 'sqlite')"""
+    if kind == 'sqlite':
+        return SQLiteBackend(path or 'cache/results.db', max_entries or 10000)
+    if kind == 'memory':
+        return MemoryBackend(max_entries or 1024)
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+class ResultCache:
+    """Cache module results keyed on the normalized query and options"""
+
+    def __init__(self, backend=None, ttls: Dict[str, float] = None, metrics: Metrics = None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.metrics = metrics or get_metrics()
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a query so trivially different spellings share an entry"""
+        return ' '.join(str(query).split()).lower()
+
+    def key(self, module: str, query: str, options: Dict = None) -> str:
+        """Build the cache key for a module call"""
+        return f"{module}:{self.normalize(query)}:{json.dumps(options or {}, sort_keys=True)}"
+
+    def ttl_for(self, module: str) -> float:
+        return self.ttls.get(module, DEFAULT_TTL)
+
+    def lookup(self, module: str, query: str, options: Dict = None) -> Tuple[bool, Any]:
+        """Return (found, value) for a fresh entry, counting the hit or miss"""
+        found, value = self.backend.get(self.key(module, query, options))
+        self._count(self.hits if found else self.misses, module)
+        return found, value
+
+    def put(self, module: str, query: str, value: Any, options: Dict = None):
+        """Store a result computed outside get_or_compute"""
+        self.backend.set(self.key(module, query, options), value, self.ttl_for(module))
+
+    def get_or_compute(self, module: str, query: str, compute: Callable[[], Any],
+                       options: Dict = None, bypass: bool = False,
+                       cacheable: Callable[[Any], bool] = None) -> Any:
+        """Return a cached result, or compute and store it.
+
+        With ``bypass`` the cached entry is ignored but the fresh result
+        still replaces it. Results rejected by ``cacheable`` are returned
+        without being stored.
+        """
+        if bypass:
+            self._count(self.misses, module)
+        else:
+            found, value = self.lookup(module, query, options)
+            if found:
+                return value
+        value = compute()
+        if cacheable is None or cacheable(value):
+            self.put(module, query, value, options)
+        return value
+
+    def stats(self) -> Dict:
+        """Hit/miss counters per module plus backend size"""
+        with self._lock:
+            hits, misses = dict(self.hits), dict(self.misses)
+        return {
+            'backend': type(self.backend).__name__,
+            'entries': len(self.backend),
+            'hits': sum(hits.values()),
+            'misses': sum(misses.values()),
+            'modules': {
+                module: {'hits': hits.get(module, 0), 'misses': misses.get(module, 0)}
+                for module in sorted(set(hits) | set(misses))
+            }
+        }
+
+    def _count(self, counter: Dict[str, int], module: str):
+        with self._lock:
+            counter[module] = counter.get(module, 0) + 1
+        self.metrics.inc('osint_cache_requests_total',
+                         {'module': module, 'result': 'hit' if counter is self.hits else 'miss'})
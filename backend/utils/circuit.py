@@ -0,0 +1,153 @@
+"""
+Circuit Breakers
+Fail fast for providers that keep erroring instead of waiting out every timeout
+"""
+
+import os
+import threading
+import time
+from typing import Dict
+
+import requests
+
+from utils.metrics import Metrics, get_metrics
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpen(requests.RequestException):
+    """Raised instead of calling a provider whose circuit is open"""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} circuit open, retry after {retry_after:.1f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one provider.
+
+    ``failure_threshold`` consecutive failures open the circuit. After
+    ``cooldown`` seconds a single trial call is let through (half-open):
+    success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, provider: str, failure_threshold: int = 5, cooldown: float = 30.0,
+                 metrics: Metrics = None):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.metrics = metrics or get_metrics()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Let a call through or raise CircuitOpen"""
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.opened_at + self.cooldown - time.monotonic()
+                if remaining > 0:
+                    self._reject(remaining)
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self.trial_in_flight:
+                    self._reject(0.0)
+                self.trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.trial_in_flight = False
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                if self.state != OPEN:
+                    self._transition(OPEN)
+
+    def release(self):
+        """End a call that says nothing about provider health (e.g. it was throttled)"""
+        with self._lock:
+            self.trial_in_flight = False
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a trial call through"""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def _transition(self, state: str):
+        self.state = state
+        self.metrics.inc('osint_circuit_transitions_total', {'provider': self.provider, 'state': state})
+        self.metrics.set('osint_circuit_open', {CLOSED: 0, HALF_OPEN: 0.5, OPEN: 1}[state],
+                         {'provider': self.provider})
+
+    def _reject(self, retry_after: float):
+        self.rejected += 1
+        self.metrics.inc('osint_circuit_rejected_total', {'provider': self.provider})
+        raise CircuitOpen(self.provider, retry_after)
+
+class CircuitBoard:
+    """One circuit breaker per provider, created on first use"""
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0, metrics: Metrics = None):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.metrics = metrics or get_metrics()
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'CircuitBoard':
+        return cls(
+            failure_threshold=int(os.environ.get('CIRCUIT_FAILURES', 5)),
+            cooldown=float(os.environ.get('CIRCUIT_COOLDOWN', 30))
+        )
+
+    def get(self, provider: str) -> CircuitBreaker:
+        breaker = self._breakers.get(provider)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(provider)
+                if breaker is None:
+                    breaker = self._breakers[provider] = CircuitBreaker(
+                        provider, self.failure_threshold, self.cooldown, self.metrics)
+        return breaker
+
+    def open_circuits(self) -> Dict[str, float]:
+        """Providers currently failing fast, with seconds until their next trial"""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.provider: round(breaker.retry_after(), 1)
+                for breaker in breakers if breaker.state != CLOSED}
+
+    def stats(self) -> Dict:
+        """State, consecutive failures and fail-fast count per provider"""
+        with self._lock:
+            breakers = sorted(self._breakers.items())
+        return {
+            provider: {'state': breaker.state, 'failures': breaker.failures, 'rejected': breaker.rejected}
+            for provider, breaker in breakers
+        }
+
+_board = None
+_board_lock = threading.Lock()
+
+def get_circuit_board() -> CircuitBoard:
+    """Return the process-wide circuit board, creating it on first use"""
+    global _board
+    if _board is None:
+        with _board_lock:
+            if _board is None:
+                _board = CircuitBoard.from_env()
+    return _board
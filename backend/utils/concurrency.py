@@ -0,0 +1,97 @@
+"""
+Concurrency Utilities
+Runs independent OSINT calls concurrently under per-call and overall deadlines
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from utils.circuit import CircuitOpen
+from utils.ratelimit import Throttled
+
+class FanOut:
+    """Run named calls concurrently and collect their outcomes"""
+
+    def __init__(self, max_workers: int = 16, thread_name_prefix: str = 'fanout',
+                 observer: Callable[[str, Dict], None] = None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix=thread_name_prefix)
+        # Called with (name, outcome) for every finished or timed-out call
+        self.observer = observer
+
+    def iter_results(self, calls: Dict[str, Callable], timeout: float, budget: Optional[float] = None,
+                     pools: Dict[str, 'FanOut'] = None) -> Iterator[Tuple[str, Dict]]:
+        """Yield (name, outcome) pairs in completion order.
+
+        Each call gets ``timeout`` seconds; ``budget`` caps the whole batch.
+        Calls still running at the deadline are reported as timeouts and
+        left to finish in the background. ``pools`` runs the named calls on
+        another FanOut's threads; their outcomes are still observed here.
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        if budget is not None:
+            deadline = min(deadline, start + budget)
+
+        pools = pools or {}
+        pending = {pools.get(name, self).executor.submit(self._timed, fn): name for name, fn in calls.items()}
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, outcome = pending.pop(future), future.result()
+                self._observe(name, outcome)
+                yield name, outcome
+
+        elapsed_ms = int((time.monotonic() - start) * 1000)
+        for future, name in pending.items():
+            future.cancel()
+            outcome = {'status': 'timeout', 'elapsed_ms': elapsed_ms}
+            self._observe(name, outcome)
+            yield name, outcome
+
+    def run(self, calls: Dict[str, Callable], timeout: float,
+            budget: Optional[float] = None) -> Dict[str, Dict]:
+        """Run all calls and return outcomes keyed by name, in call order"""
+        outcomes = dict(self.iter_results(calls, timeout, budget))
+        return {name: outcomes[name] for name in calls}
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and release the worker threads"""
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _observe(self, name: str, outcome: Dict):
+        if self.observer is not None:
+            try:
+                self.observer(name, outcome)
+            except Exception as e:
+                print(f"Fan-out observer error: {e}")
+
+    @staticmethod
+    def _timed(fn: Callable) -> Dict:
+        """Invoke a call, capturing its result or error and elapsed time"""
+        start = time.monotonic()
+        try:
+            result = fn()
+        except (Throttled, CircuitOpen) as e:
+            # The provider was never (or not fully) asked, so this is not an empty answer
+            return {
+                'status': 'throttled' if isinstance(e, Throttled) else 'circuit_open',
+                'error': str(e),
+                'retry_after': round(e.retry_after, 1),
+                'elapsed_ms': int((time.monotonic() - start) * 1000)
+            }
+        except Exception as e:
+            return {
+                'status': 'error',
+                'error': str(e),
+                'elapsed_ms': int((time.monotonic() - start) * 1000)
+            }
+        return {
+            'status': 'ok',
+            'result': result,
+            'elapsed_ms': int((time.monotonic() - start) * 1000)
+        }
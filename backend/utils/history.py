@@ -0,0 +1,235 @@
+"""
+Search History
+SQLite store of past searches and their findings, indexed for history and change queries
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils.cache import ResultCache
+from utils.report_generator import INCOMPLETE_STATUSES
+
+# Fields that identify a finding, in order of preference; anything else is keyed on its JSON
+IDENTITY_FIELDS = ('profile_url', 'search_url', 'email', 'e164_format', 'number', 'phone',
+                   'formatted_address', 'address', 'url', 'username', 'name')
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS searches ('
+    'id TEXT PRIMARY KEY, kind TEXT NOT NULL, query TEXT NOT NULL, target TEXT NOT NULL, '
+    'created_at REAL NOT NULL, statuses TEXT NOT NULL, finding_count INTEGER NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS findings ('
+    'search_id TEXT NOT NULL REFERENCES searches (id) ON DELETE CASCADE, '
+    'module TEXT NOT NULL, platform TEXT NOT NULL, value TEXT NOT NULL, data TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS idx_searches_target ON searches (target, kind, created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_searches_created ON searches (created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_findings_search ON findings (search_id)',
+    'CREATE INDEX IF NOT EXISTS idx_findings_module ON findings (module, platform, search_id)',
+    'CREATE INDEX IF NOT EXISTS idx_findings_value ON findings (value)',
+)
+
+def _finding_value(item) -> str:
+    if isinstance(item, dict):
+        for field in IDENTITY_FIELDS:
+            if item.get(field):
+                return str(item[field])
+    return json.dumps(item, sort_keys=True, default=str)
+
+def extract_findings(results: Dict) -> Tuple[Dict[str, str], List[Tuple[str, str, str, object]]]:
+    """Split search results into per-module statuses and (module, platform, value, data) findings.
+
+    Modules (or social platforms) that did not complete yield a status but
+    no findings, so they are not mistaken for findings that disappeared.
+    """
+    statuses, findings = {}, []
+    for module, data in results.items():
+        if isinstance(data, dict) and data.get('status') in INCOMPLETE_STATUSES:
+            statuses[module] = data['status']
+            continue
+        statuses[module] = 'ok'
+        if module == 'social_media' and isinstance(data, dict):
+            for platform, profiles in data.items():
+                if not isinstance(profiles, list):
+                    statuses[f'{module}:{platform}'] = profiles.get('status', 'error')
+                    continue
+                findings.extend((module, platform, _finding_value(p), p) for p in profiles)
+        elif isinstance(data, list):
+            findings.extend((module, '', _finding_value(item), item) for item in data)
+        elif data:
+            findings.append((module, '', _finding_value(data), data))
+    return statuses, findings
+
+class HistoryStore:
+    """Searches and findings in SQLite (WAL), safe to share across threads"""
+
+    def __init__(self, path: str = 'history/history.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA foreign_keys=ON')
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def record(self, search_id: str, kind: str, query: str, results: Dict, created_at: float = None):
+        """Store one search and its findings (re-recording a search id replaces it)"""
+        statuses, findings = extract_findings(results)
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM searches WHERE id = ?', (search_id,))
+            self._conn.execute(
+                'INSERT INTO searches (id, kind, query, target, created_at, statuses, finding_count) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (search_id, kind, query, ResultCache.normalize(query), created_at or time.time(),
+                 json.dumps(statuses), len(findings))
+            )
+            self._conn.executemany(
+                'INSERT INTO findings (search_id, module, platform, value, data) VALUES (?, ?, ?, ?, ?)',
+                [(search_id, module, platform, value, json.dumps(data, default=str))
+                 for module, platform, value, data in findings]
+            )
+
+    def history(self, query: str = None, kind: str = None, module: str = None, platform: str = None,
+                since: float = None, until: float = None, limit: int = 50, offset: int = 0) -> Dict:
+        """Newest-first page of searches matching the filters, with the total count"""
+        where, params = [], []
+        if query:
+            where.append('s.target = ?')
+            params.append(ResultCache.normalize(query))
+        if kind:
+            where.append('s.kind = ?')
+            params.append(kind)
+        if since is not None:
+            where.append('s.created_at >= ?')
+            params.append(since)
+        if until is not None:
+            where.append('s.created_at < ?')
+            params.append(until)
+        if module or platform:
+            # Only searches with at least one finding from that module/platform
+            clause, sub = [], []
+            if module:
+                clause.append('f.module = ?')
+                sub.append(module)
+            if platform:
+                clause.append('f.platform = ?')
+                sub.append(platform)
+            where.append(f"EXISTS (SELECT 1 FROM findings f WHERE f.search_id = s.id AND {' AND '.join(clause)})")
+            params.extend(sub)
+        condition = f"WHERE {' AND '.join(where)}" if where else ''
+
+        with self._lock:
+            total = self._conn.execute(f'SELECT COUNT(*) FROM searches s {condition}', params).fetchone()[0]
+            rows = self._conn.execute(
+                'SELECT s.id, s.kind, s.query, s.created_at, s.statuses, s.finding_count '
+                f'FROM searches s {condition} ORDER BY s.created_at DESC LIMIT ? OFFSET ?',
+                params + [limit, offset]
+            ).fetchall()
+        return {
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+            'searches': [self._search_row(row) for row in rows]
+        }
+
+    def get(self, search_id: str) -> Optional[Dict]:
+        """One search with all of its findings"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT id, kind, query, created_at, statuses, finding_count FROM searches WHERE id = ?',
+                (search_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            findings = self._conn.execute(
+                'SELECT module, platform, value, data FROM findings WHERE search_id = ? ORDER BY rowid',
+                (search_id,)
+            ).fetchall()
+        search = self._search_row(row)
+        search['findings'] = [self._finding_row(finding) for finding in findings]
+        return search
+
+    def changes(self, query: str, kind: str = 'name', since: str = None) -> Optional[Dict]:
+        """Findings added and removed between two searches of the same target.
+
+        Compares the latest search with ``since`` (a search id), or with the
+        search before it. Modules that did not complete in both searches are
+        left out of the comparison.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, kind, query, created_at, statuses, finding_count FROM searches '
+                'WHERE target = ? AND kind = ? ORDER BY created_at DESC LIMIT 2',
+                (ResultCache.normalize(query), kind)
+            ).fetchall()
+            if since is not None and rows:
+                previous = self._conn.execute(
+                    'SELECT id, kind, query, created_at, statuses, finding_count FROM searches WHERE id = ?',
+                    (since,)
+                ).fetchone()
+                rows = rows[:1] + ([previous] if previous else [])
+        if not rows:
+            return None
+        current = self._search_row(rows[0])
+        if len(rows) < 2:
+            return {'current': current, 'previous': None, 'added': [], 'removed': []}
+        previous = self._search_row(rows[1])
+
+        comparable = {module for module, status in current['statuses'].items()
+                      if status == 'ok' and previous['statuses'].get(module) == 'ok'}
+        # Social platforms that were throttled or failed in either search
+        skipped = {key for search in (current, previous)
+                   for key, status in search['statuses'].items() if status != 'ok'}
+        now = self._finding_map(current['search_id'], comparable, skipped)
+        before = self._finding_map(previous['search_id'], comparable, skipped)
+        return {
+            'current': current,
+            'previous': previous,
+            'added': [now[key] for key in now.keys() - before.keys()],
+            'removed': [before[key] for key in before.keys() - now.keys()]
+        }
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM searches').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _finding_map(self, search_id: str, comparable: set, skipped: set) -> Dict[Tuple[str, str, str], Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT module, platform, value, data FROM findings WHERE search_id = ?', (search_id,)
+            ).fetchall()
+        return {
+            (module, platform, value): self._finding_row((module, platform, value, data))
+            for module, platform, value, data in rows
+            if module in comparable and f'{module}:{platform}' not in skipped
+        }
+
+    @staticmethod
+    def _search_row(row) -> Dict:
+        search_id, kind, query, created_at, statuses, finding_count = row
+        return {
+            'search_id': search_id,
+            'type': kind,
+            'query': query,
+            'created_at': created_at,
+            'statuses': json.loads(statuses),
+            'finding_count': finding_count
+        }
+
+    @staticmethod
+    def _finding_row(row) -> Dict:
+        module, platform, value, data = row
+        finding = {'module': module, 'value': value, 'data': json.loads(data)}
+        if platform:
+            finding['platform'] = platform
+        return finding
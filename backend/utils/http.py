@@ -0,0 +1,150 @@
+"""
+HTTP Transport
+Shared, pooled session used by every OSINT module for outbound requests
+"""
+
+import os
+import threading
+import time
+from functools import partial
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.circuit import CircuitBoard, get_circuit_board
+from utils.metrics import Metrics, get_metrics
+from utils.ratelimit import OutboundScheduler, Throttled, parse_retry_after
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+def rate_limited(response: requests.Response) -> bool:
+    """True for a 429, or a 403 saying the quota is spent (as GitHub answers when rate limited)"""
+    if response.status_code == 429:
+        return True
+    return response.status_code == 403 and (
+        response.headers.get('X-RateLimit-Remaining') == '0' or 'Retry-After' in response.headers)
+
+def rate_limit_delay(response: requests.Response) -> Optional[float]:
+    """Seconds until a rate-limited host takes requests again, from Retry-After or X-RateLimit-Reset"""
+    delay = parse_retry_after(response.headers.get('Retry-After'))
+    if delay is None and response.headers.get('X-RateLimit-Reset', '').isdigit():
+        delay = max(0.0, int(response.headers['X-RateLimit-Reset']) - time.time())
+    return delay
+
+class OutboundSession(requests.Session):
+    """requests.Session with per-host keep-alive pools, pacing, circuit breakers and a single User-Agent"""
+
+    def __init__(self, user_agent: str = None, pool_connections: int = None,
+                 pool_maxsize: int = None, metrics: Metrics = None,
+                 scheduler: OutboundScheduler = None, retries_429: int = None,
+                 circuits: CircuitBoard = None):
+        super().__init__()
+        self.metrics = metrics or get_metrics()
+        self.scheduler = scheduler or OutboundScheduler.from_env()
+        self.circuits = circuits or get_circuit_board()
+        # How many times a 429 is retried after its Retry-After before giving up
+        self.retries_429 = retries_429 if retries_429 is not None else int(os.environ.get('HTTP_429_RETRIES', 1))
+        self.headers['User-Agent'] = user_agent or os.environ.get('OSINT_USER_AGENT', DEFAULT_USER_AGENT)
+
+        # pool_connections: number of hosts kept warm; pool_maxsize: connections per host
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections or int(os.environ.get('HTTP_POOL_CONNECTIONS', 32)),
+            pool_maxsize=pool_maxsize or int(os.environ.get('HTTP_POOL_MAXSIZE', 16))
+        )
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        """Send a request through the host's circuit breaker and scheduler slot, backing off when rate limited.
+
+        Raises Throttled when the host stays rate limited and CircuitOpen
+        when it has been failing, so callers can tell either apart from
+        "nothing found".
+        """
+        host = urlsplit(url).hostname or 'unknown'
+        breaker = self.circuits.get(host)
+        for attempt in range(self.retries_429 + 1):
+            breaker.allow()
+            try:
+                with self.scheduler.slot(host):
+                    response = self._send(host, method, url, *args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                breaker.record_failure()
+                raise
+            except BaseException:
+                breaker.release()
+                raise
+            # Connection failures and 5xx count against the host; rate limiting says nothing about its health
+            limited = rate_limited(response)
+            if response.status_code >= 500:
+                breaker.record_failure()
+            elif limited:
+                breaker.release()
+            else:
+                breaker.record_success()
+            if not limited:
+                return response
+            delay = rate_limit_delay(response)
+            if delay is None:
+                delay = 2.0 ** attempt
+            self.scheduler.backoff(host, delay)
+            response.close()
+        raise Throttled(host, delay, str(response.status_code))
+
+    def _send(self, host: str, method, url, *args, **kwargs):
+        """Send one request, recording per-host latency, status and response bytes"""
+        start = time.monotonic()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.RequestException as e:
+            self._record(host, type(e).__name__, start)
+            raise
+        self._record(host, str(response.status_code), start)
+        record_bytes = partial(self.metrics.inc, 'osint_outbound_bytes_total', {'host': host})
+        if kwargs.get('stream'):
+            # Counted by read_prefix as the body is actually read
+            response.record_bytes = record_bytes
+        else:
+            record_bytes(len(response.content))
+        return response
+
+    def _record(self, host: str, status: str, start: float):
+        self.metrics.inc('osint_outbound_requests_total', {'host': host, 'status': status})
+        self.metrics.observe('osint_outbound_seconds', time.monotonic() - start, {'host': host})
+
+def read_prefix(response: requests.Response, limit: int,
+                stop: Callable[[bytes], bool] = None) -> bytes:
+    """Read at most ``limit`` body bytes of a streamed response, then close it.
+
+    ``stop`` sees the bytes read so far after each chunk and ends the read
+    early by returning True. Closing before the end of the body gives up
+    the connection, which is cheaper than downloading a large page.
+    """
+    body = b''
+    try:
+        if limit > 0:
+            for chunk in response.iter_content(chunk_size=min(limit, 4096)):
+                body += chunk
+                if len(body) >= limit or (stop is not None and stop(body)):
+                    break
+    finally:
+        response.close()
+    body = body[:limit]
+    record_bytes = getattr(response, 'record_bytes', None)
+    if record_bytes is not None:
+        record_bytes(len(body))
+    return body
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session() -> OutboundSession:
+    """Return the process-wide outbound session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = OutboundSession()
+    return _session
@@ -0,0 +1,197 @@
+"""
+Image Index
+Perceptual hashes of searched images, for answering near-duplicate uploads from earlier results
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from itertools import combinations
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from utils.uploads import check_pixels
+
+HASH_BITS = 64
+# The 64-bit pHash is split into this many 16-bit chunks for multi-index lookups
+CHUNKS = 4
+CHUNK_BITS = HASH_BITS // CHUNKS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+# Matching search_ids returned per lookup, closest first
+MAX_MATCHES = 20
+
+def _dct_matrix(size: int) -> np.ndarray:
+    """Orthonormal DCT-II basis, so a 2-D DCT is two matrix products"""
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    matrix = np.cos(np.pi * (2 * n + 1) * k / (2 * size)) * np.sqrt(2 / size)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+DCT_32 = _dct_matrix(32)
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    value = 0
+    for bit in bits.ravel():
+        value = (value << 1) | int(bit)
+    return value
+
+def _to_signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << HASH_BITS) if value < 0 else value
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+def image_hashes(stream: BinaryIO) -> Tuple[int, int]:
+    """64-bit (pHash, dHash) of an image, decoding as little of it as the format allows.
+
+    Raises ImageTooLarge, before decoding anything, for images over the pixel limit.
+    """
+    with Image.open(stream) as image:
+        # Only JPEG can decode straight to a reduced size and greyscale; every
+        # other format is decoded in full by convert, so its size is checked first
+        check_pixels(image.width, image.height)
+        image.draft('L', (64, 64))
+        grey = image.convert('L')
+
+    pixels = np.asarray(grey.resize((32, 32), Image.LANCZOS), dtype=np.float64)
+    low = (DCT_32 @ pixels @ DCT_32.T)[:8, :8]
+    # The DC term says nothing about structure, so it is left out of the median
+    phash = _bits_to_int(low > np.median(low.ravel()[1:]))
+
+    small = np.asarray(grey.resize((9, 8), Image.LANCZOS), dtype=np.int16)
+    dhash = _bits_to_int(small[:, 1:] > small[:, :-1])
+    return phash, dhash
+
+class ImageIndex:
+    """Near-duplicate lookup over previously searched images, persisted in SQLite.
+
+    Hashes are held in memory in a multi-index hash table: each pHash is
+    filed under its four 16-bit chunks. Two hashes within ``max_distance``
+    bits must agree within ``max_distance // 4`` bits on at least one
+    chunk, so a lookup only probes the few chunk values that close and
+    checks the candidates found there, however large the index grows.
+    A match must be within ``max_distance`` on both pHash and dHash.
+    """
+
+    def __init__(self, path: str = 'index/images.db', max_distance: int = 6):
+        self.path = path
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._hashes = {}
+        self._tables = [{} for _ in range(CHUNKS)]
+        self._last_rowid = 0
+        self._probes = self._chunk_probes(max_distance // CHUNKS)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS images ('
+            'search_id TEXT PRIMARY KEY, sha256 TEXT NOT NULL, phash INTEGER NOT NULL, '
+            'dhash INTEGER NOT NULL, created_at REAL NOT NULL, results TEXT NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_images_sha256 ON images (sha256)')
+        self._conn.commit()
+        with self._lock:
+            self._catch_up()
+
+    # Exposed here so callers need not import NumPy and Pillow until the index is opened
+    hashes = staticmethod(image_hashes)
+
+    def add(self, search_id: str, sha256: str, phash: int, dhash: int, results: Dict):
+        """Remember a finished search of an image"""
+        with self._lock:
+            for rowid, in self._conn.execute('SELECT rowid FROM images WHERE search_id = ?', (search_id,)):
+                self._hashes.pop(rowid, None)
+            with self._conn:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO images (search_id, sha256, phash, dhash, created_at, results) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (search_id, sha256, _to_signed(phash), _to_signed(dhash), time.time(),
+                     json.dumps(results, default=str))
+                )
+            self._catch_up()
+
+    def lookup(self, sha256: str, phash: int, dhash: int) -> Optional[Dict]:
+        """Closest earlier search of the same or a near-duplicate image, or None.
+
+        Returns its results, the distance in bits (0 for identical bytes) and
+        every matching search_id, closest first.
+        """
+        with self._lock:
+            self._catch_up()
+            exact = self._conn.execute(
+                'SELECT rowid FROM images WHERE sha256 = ? ORDER BY created_at DESC', (sha256,)
+            ).fetchall()
+            matches = {rowid: 0 for rowid, in exact}
+            for rowid in self._candidates(phash):
+                if rowid in matches or rowid not in self._hashes:
+                    continue
+                indexed_phash, indexed_dhash = self._hashes[rowid]
+                distance = hamming(phash, indexed_phash)
+                if distance <= self.max_distance and hamming(dhash, indexed_dhash) <= self.max_distance:
+                    matches[rowid] = distance
+            if not matches:
+                return None
+            ranked = sorted(matches, key=matches.get)[:MAX_MATCHES]
+            placeholders = ','.join('?' * len(ranked))
+            rows = dict(
+                (rowid, (search_id, results)) for rowid, search_id, results in self._conn.execute(
+                    f'SELECT rowid, search_id, results FROM images WHERE rowid IN ({placeholders})', ranked)
+            )
+        ranked = [rowid for rowid in ranked if rowid in rows]
+        if not ranked:
+            return None
+        best = rows[ranked[0]]
+        return {
+            'search_id': best[0],
+            'distance': matches[ranked[0]],
+            'search_ids': [rows[rowid][0] for rowid in ranked],
+            'results': json.loads(best[1])
+        }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'images': len(self._hashes), 'max_distance': self.max_distance}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _catch_up(self):
+        """File rows added since the last call, including those written by other workers (lock held)"""
+        for rowid, phash, dhash in self._conn.execute(
+                'SELECT rowid, phash, dhash FROM images WHERE rowid > ? ORDER BY rowid', (self._last_rowid,)):
+            phash, dhash = _to_unsigned(phash), _to_unsigned(dhash)
+            # Entries of replaced searches stay in the chunk tables but are gone from _hashes
+            self._hashes[rowid] = (phash, dhash)
+            for chunk, table in enumerate(self._tables):
+                table.setdefault((phash >> (chunk * CHUNK_BITS)) & CHUNK_MASK, []).append(rowid)
+            self._last_rowid = rowid
+
+    def _candidates(self, phash: int) -> set:
+        candidates = set()
+        for chunk, table in enumerate(self._tables):
+            value = (phash >> (chunk * CHUNK_BITS)) & CHUNK_MASK
+            for flip in self._probes:
+                candidates.update(table.get(value ^ flip, ()))
+        return candidates
+
+    @staticmethod
+    def _chunk_probes(radius: int) -> List[int]:
+        """Every CHUNK_BITS-bit mask with at most ``radius`` bits set"""
+        probes = []
+        for count in range(radius + 1):
+            for bits in combinations(range(CHUNK_BITS), count):
+                probes.append(sum(1 << bit for bit in bits))
+        return probes
@@ -0,0 +1,178 @@
+"""
+Search Jobs
+Runs long searches in the background and publishes module results as they land
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+from utils.concurrency import FanOut
+from utils.report_generator import ReportAggregator
+
+class JobQueueFull(Exception):
+    """Raised when the job queue is at its depth limit"""
+
+class Job:
+    """A background search and the module results it has produced so far"""
+
+    def __init__(self, kind: str, query: str, modules: List[str]):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.query = query
+        self.status = 'queued'
+        self.error = None
+        self.closed = False
+        self.created_at = datetime.now().isoformat()
+        self.finished_at = None
+        self.finished_monotonic = None
+        self.search_id = str(uuid.uuid4())
+        self.results = {}
+        # Report summary kept current as module results arrive
+        self.report = ReportAggregator()
+        self.modules = {module: {'status': 'pending'} for module in modules}
+        self.events = []
+        self._changed = threading.Condition()
+
+    def publish(self, event: str, data: Dict):
+        """Record an event and wake any stream waiting on this job"""
+        with self._changed:
+            self.events.append({'id': len(self.events) + 1, 'event': event, 'data': data})
+            self._changed.notify_all()
+
+    def close(self):
+        """Publish the final 'done' event; no events follow it"""
+        with self._changed:
+            self.closed = True
+            self.events.append({'id': len(self.events) + 1, 'event': 'done', 'data': self.to_dict()})
+            self._changed.notify_all()
+
+    def wait_for_events(self, after: int, timeout: float) -> List[Dict]:
+        """Return events newer than ``after``, waiting up to ``timeout`` for one"""
+        with self._changed:
+            if len(self.events) <= after and not self.closed:
+                self._changed.wait(timeout)
+            return self.events[after:]
+
+    def search_results(self) -> Dict:
+        """Results in the same shape the synchronous search endpoints return"""
+        return {
+            'query': self.query,
+            'timestamp': self.created_at,
+            'search_id': self.search_id,
+            'results': dict(self.results)
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.id,
+            'type': self.kind,
+            'status': self.status,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+            'modules': {module: dict(state) for module, state in self.modules.items()},
+            'pending': [module for module, state in self.modules.items() if state['status'] == 'pending'],
+            'summary': self.report.summary(),
+            **self.search_results()
+        }
+
+class JobManager:
+    """Bounded worker pool and registry for background search jobs"""
+
+    def __init__(self, fan_out: FanOut, max_workers: int = 4, max_queued: int = 32,
+                 retention: float = 60 * 60, on_finish: Callable[[Job], None] = None):
+        self.fan_out = fan_out
+        # Called with each job that ran to completion, before its 'done' event
+        self.on_finish = on_finish
+        self.max_active = max_workers + max_queued
+        self.retention = retention
+        self._jobs = {}
+        self._active = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+
+    def submit(self, kind: str, query: str, calls: Dict[str, Callable],
+               timeout: float, budget: Optional[float] = None) -> Job:
+        """Queue a job, raising JobQueueFull when the depth limit is reached"""
+        job = Job(kind, query, list(calls))
+        with self._lock:
+            self._prune()
+            if self._active >= self.max_active:
+                raise JobQueueFull(f"Job queue is full ({self.max_active} active jobs)")
+            self._active += 1
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, calls, timeout, budget)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stream(self, job: Job, after: int = 0, heartbeat: float = 15) -> Iterator[Optional[Dict]]:
+        """Yield job events as they happen; None marks an idle heartbeat"""
+        while True:
+            events = job.wait_for_events(after, heartbeat)
+            if not events:
+                if job.closed:
+                    return
+                yield None
+                continue
+            for event in events:
+                yield event
+            after = events[-1]['id']
+            if events[-1]['event'] == 'done':
+                return
+
+    def stats(self) -> Dict:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            return {
+                'active': self._active,
+                'limit': self.max_active,
+                'queued': statuses.count('queued'),
+                'running': statuses.count('running'),
+                'retained': len(statuses)
+            }
+
+    def shutdown(self):
+        """Let running jobs finish, drop queued ones and stop the workers"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _run(self, job: Job, calls: Dict[str, Callable], timeout: float, budget: Optional[float]):
+        """Worker body: run module calls and publish each result as it completes"""
+        try:
+            job.status = 'running'
+            job.publish('status', {'status': job.status})
+            for module, outcome in self.fan_out.iter_results(calls, timeout, budget):
+                state = {'status': outcome['status'], 'elapsed_ms': outcome['elapsed_ms']}
+                if outcome['status'] == 'ok':
+                    job.results[module] = outcome['result']
+                else:
+                    job.results[module] = outcome
+                job.modules[module] = state
+                job.report.add(module, job.results[module])
+                job.publish('module', {'module': module, 'result': job.results[module], **state})
+            job.status = 'done'
+            if self.on_finish is not None:
+                self.on_finish(job)
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now().isoformat()
+            job.finished_monotonic = time.monotonic()
+            with self._lock:
+                self._active -= 1
+            job.close()
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window (lock held)"""
+        cutoff = time.monotonic() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_monotonic is not None and job.finished_monotonic < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
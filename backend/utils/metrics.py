@@ -0,0 +1,153 @@
+"""
+Metrics
+In-process counters and latency histograms exported in Prometheus text format
+"""
+
+import threading
+import time
+from typing import Dict, List, Tuple
+
+# Latency buckets in seconds, from cache hits up to a full provider timeout
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict[str, str] = None) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(key: LabelKey, extra: Dict[str, str] = None) -> str:
+    pairs = list(key) + list((extra or {}).items())
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+class Metrics:
+    """Thread-safe registry of counters, gauges and histograms"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.started = time.time()
+        self._help = {}
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, kind: str, help_text: str):
+        """Register the TYPE and HELP lines for a metric"""
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, labels: Dict[str, str] = None, value: float = 1):
+        """Increment a counter"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, labels: Dict[str, str] = None):
+        """Set a gauge"""
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, labels: Dict[str, str] = None):
+        """Record one histogram observation (seconds)"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            state = series.get(key)
+            if state is None:
+                state = series[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['buckets'][i] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    def counter_values(self, name: str) -> Dict[LabelKey, float]:
+        with self._lock:
+            return dict(self._counters.get(name, {}))
+
+    def histogram_values(self, name: str) -> Dict[LabelKey, Dict]:
+        with self._lock:
+            return {key: {'buckets': list(state['buckets']), 'sum': state['sum'], 'count': state['count']}
+                    for key, state in self._histograms.get(name, {}).items()}
+
+    def render(self) -> str:
+        """Prometheus text exposition of every metric"""
+        lines = []
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+            histograms = {name: {key: dict(state, buckets=list(state['buckets']))
+                                 for key, state in series.items()}
+                          for name, series in self._histograms.items()}
+
+        for name in sorted(counters):
+            self._header(lines, name, 'counter')
+            for key, value in sorted(counters[name].items()):
+                lines.append(f'{name}{_format_labels(key)} {value:g}')
+
+        for name in sorted(gauges):
+            self._header(lines, name, 'gauge')
+            for key, value in sorted(gauges[name].items()):
+                lines.append(f'{name}{_format_labels(key)} {value:g}')
+
+        for name in sorted(histograms):
+            self._header(lines, name, 'histogram')
+            for key, state in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, state['buckets']):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels(key, {"le": f"{bound:g}"})} {cumulative}')
+                lines.append(f'{name}_bucket{_format_labels(key, {"le": "+Inf"})} {state["count"]}')
+                lines.append(f'{name}_sum{_format_labels(key)} {state["sum"]:.6f}')
+                lines.append(f'{name}_count{_format_labels(key)} {state["count"]}')
+
+        lines.append('# TYPE osint_uptime_seconds gauge')
+        lines.append(f'osint_uptime_seconds {time.time() - self.started:.0f}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self, calls: str, latency: str, label: str) -> Dict[str, Dict]:
+        """Per-label call counts by status plus mean latency, for /api/health"""
+        result = {}
+        for key, value in self.counter_values(calls).items():
+            labels = dict(key)
+            entry = result.setdefault(labels.get(label, ''), {'calls': 0})
+            entry['calls'] += int(value)
+            status = labels.get('status', 'ok')
+            entry[status] = entry.get(status, 0) + int(value)
+        for key, state in self.histogram_values(latency).items():
+            entry = result.setdefault(dict(key).get(label, ''), {'calls': 0})
+            if state['count']:
+                entry['mean_ms'] = round(state['sum'] / state['count'] * 1000, 1)
+        return result
+
+    def _header(self, lines: List[str], name: str, default_kind: str):
+        kind, help_text = self._help.get(name, (default_kind, ''))
+        if help_text:
+            lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+_metrics = Metrics()
+_metrics.describe('osint_module_calls_total', 'counter', 'OSINT module calls by outcome')
+_metrics.describe('osint_module_seconds', 'histogram', 'OSINT module call latency')
+_metrics.describe('osint_platform_calls_total', 'counter', 'Social media platform probes by outcome')
+_metrics.describe('osint_platform_seconds', 'histogram', 'Social media platform probe latency')
+_metrics.describe('osint_outbound_requests_total', 'counter', 'Outbound HTTP requests by host and status')
+_metrics.describe('osint_outbound_seconds', 'histogram', 'Outbound HTTP request latency by host')
+_metrics.describe('osint_outbound_bytes_total', 'counter', 'Outbound HTTP response bytes by host')
+_metrics.describe('osint_outbound_throttled_total', 'counter', 'Outbound requests delayed, rejected or backed off by host')
+_metrics.describe('osint_circuit_open', 'gauge', 'Whether a provider circuit breaker is open (1) or half-open (0.5)')
+_metrics.describe('osint_circuit_transitions_total', 'counter', 'Circuit breaker state changes by provider')
+_metrics.describe('osint_circuit_rejected_total', 'counter', 'Calls failed fast by an open circuit, by provider')
+_metrics.describe('osint_cache_requests_total', 'counter', 'Result cache lookups by module and result')
+_metrics.describe('osint_image_index_total', 'counter', 'Image index lookups by result (hit, miss, unhashable)')
+
+def get_metrics() -> Metrics:
+    """Return the process-wide metrics registry"""
+    return _metrics
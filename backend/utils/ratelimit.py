@@ -0,0 +1,201 @@
+"""
+Outbound Rate Limiting
+Per-host token buckets, concurrency caps and Retry-After backoff for outbound probes
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+import requests
+
+from utils.metrics import Metrics, get_metrics
+
+# Built-in limits for providers with published quotas: host -> (requests/second, burst)
+DEFAULT_HOST_LIMITS = {
+    'api.github.com': (10 / 60, 5),  # unauthenticated search API: 10 requests per minute
+}
+
+class Throttled(requests.RequestException):
+    """Raised when a host's limits would hold a request past the allowed wait"""
+
+    def __init__(self, host: str, retry_after: float, reason: str):
+        super().__init__(f"{host} throttled ({reason}), retry after {retry_after:.1f}s")
+        self.host = host
+        self.retry_after = retry_after
+        self.reason = reason
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+class HostLimit:
+    """Token bucket, concurrency cap and backoff window for one host"""
+
+    def __init__(self, rate: float, burst: float, max_concurrent: int):
+        # Rate <= 0 disables the bucket; the concurrency cap still applies
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.active = 0
+        self.delayed = 0
+        self.rejected = 0
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.lock = threading.Lock()
+
+    def reserve(self) -> Tuple[float, str]:
+        """Take a token, returning how long to wait before using it and why.
+
+        Tokens may go negative: each caller reserves the next free send
+        time, so waiters are released at the bucket's rate in arrival order.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.rate <= 0:
+                rate_wait = 0.0
+            else:
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                self.tokens -= 1
+                rate_wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            backoff_wait = self.blocked_until - now
+            if backoff_wait > rate_wait:
+                return backoff_wait, 'backoff'
+            return rate_wait, 'rate'
+
+    def refund(self):
+        """Return a token reserved by a request that will not be sent"""
+        with self.lock:
+            if self.rate > 0:
+                self.tokens = min(self.burst, self.tokens + 1)
+
+    def block_for(self, seconds: float):
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+class OutboundScheduler:
+    """Paces outbound requests per host so probes stay inside provider limits"""
+
+    def __init__(self, rate: float = 5.0, burst: float = 10, max_concurrent: int = 4,
+                 max_wait: float = 10.0, max_backoff: float = 300.0,
+                 overrides: Dict[str, Tuple[float, float]] = None, metrics: Metrics = None):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self.max_backoff = max_backoff
+        # Per-host (rate, burst); pass {} to drop the built-in provider limits
+        self.overrides = dict(DEFAULT_HOST_LIMITS if overrides is None else overrides)
+        self.metrics = metrics or get_metrics()
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'OutboundScheduler':
+        """Build a scheduler from HTTP_HOST_* settings.
+
+        HTTP_HOST_LIMITS overrides individual hosts as a comma-separated
+        list of ``host=rate[/burst]`` entries.
+        """
+        overrides = dict(DEFAULT_HOST_LIMITS)
+        for entry in os.environ.get('HTTP_HOST_LIMITS', '').split(','):
+            host, _, limit = entry.strip().partition('=')
+            if not host or not limit:
+                continue
+            rate, _, burst = limit.partition('/')
+            overrides[host] = (float(rate), float(burst or max(1.0, float(rate))))
+        return cls(
+            rate=float(os.environ.get('HTTP_HOST_RATE', 5)),
+            burst=float(os.environ.get('HTTP_HOST_BURST', 10)),
+            max_concurrent=int(os.environ.get('HTTP_HOST_CONCURRENCY', 4)),
+            max_wait=float(os.environ.get('HTTP_THROTTLE_WAIT', 10)),
+            overrides=overrides
+        )
+
+    def limit_for(self, host: str) -> HostLimit:
+        """Return the host's limit state, creating it on first use"""
+        limit = self._hosts.get(host)
+        if limit is None:
+            with self._lock:
+                limit = self._hosts.get(host)
+                if limit is None:
+                    rate, burst = self.overrides.get(host, (self.rate, self.burst))
+                    limit = self._hosts[host] = HostLimit(rate, burst, self.max_concurrent)
+        return limit
+
+    @contextmanager
+    def slot(self, host: str):
+        """Hold a send slot for one request, waiting up to ``max_wait`` for it.
+
+        Raises Throttled when the host's rate, backoff window or concurrency
+        cap would keep the request waiting longer than that.
+        """
+        limit = self.limit_for(host)
+        start = time.monotonic()
+        wait, reason = limit.reserve()
+        if wait > self.max_wait:
+            limit.refund()
+            self._reject(limit, host, wait, reason)
+        if wait > 0:
+            with limit.lock:
+                limit.delayed += 1
+            self.metrics.inc('osint_outbound_throttled_total', {'host': host, 'action': 'delayed', 'reason': reason})
+            time.sleep(wait)
+
+        remaining = self.max_wait - (time.monotonic() - start)
+        if not limit.slots.acquire(timeout=max(remaining, 0)):
+            self._reject(limit, host, 0.0, 'concurrency')
+        with limit.lock:
+            limit.active += 1
+        try:
+            yield
+        finally:
+            with limit.lock:
+                limit.active -= 1
+            limit.slots.release()
+
+    def backoff(self, host: str, seconds: float):
+        """Hold every request to a host for ``seconds`` (capped at max_backoff)"""
+        self.limit_for(host).block_for(min(seconds, self.max_backoff))
+        self.metrics.inc('osint_outbound_throttled_total', {'host': host, 'action': 'backoff', 'reason': '429'})
+
+    def stats(self) -> Dict:
+        """Per-host limits, activity and throttling counters"""
+        now = time.monotonic()
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {
+            host: {
+                'rate': round(limit.rate, 3),
+                'burst': limit.burst,
+                'active': limit.active,
+                'blocked_for_s': round(max(0.0, limit.blocked_until - now), 1),
+                'delayed': limit.delayed,
+                'rejected': limit.rejected
+            }
+            for host, limit in sorted(hosts.items())
+        }
+
+    def _reject(self, limit: HostLimit, host: str, retry_after: float, reason: str):
+        with limit.lock:
+            limit.rejected += 1
+        self.metrics.inc('osint_outbound_throttled_total', {'host': host, 'action': 'rejected', 'reason': reason})
+        raise Throttled(host, retry_after, reason)
@@ -3,123 +3,128 @@ Report Generator Module
 Generates comprehensive OSINT reports
 """
 
+import threading
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+# Outcome statuses of modules that produced no usable result
+INCOMPLETE_STATUSES = ('timeout', 'error', 'throttled', 'circuit_open')
+
+# Results sections in report order; each maps to a summary count, a finding type and a severity
+SECTIONS = {
+    'social_media': ('social_media_profiles', 'social_media', 'medium'),
+    'emails': ('email_addresses', 'email', 'high'),
+    'email': ('email_addresses', 'email', 'high'),
+    'phones': ('phone_numbers', 'phone', 'high'),
+    'phone': ('phone_numbers', 'phone', 'high'),
+    'addresses': ('addresses', 'address', 'high'),
+    'image': ('images_found', 'image', 'medium'),
+}
+
+# Fields of a "search it yourself" link (image engines, login-only social platforms), which is
+# listed with the matches but is not one
+SEARCH_LINK_FIELDS = {'platform', 'search_url', 'note', 'name'}
+
+def _is_match(item) -> bool:
+    return isinstance(item, dict) and bool(set(item) - SEARCH_LINK_FIELDS)
+
+RECOMMENDATIONS = {
+    'social_media': "Review social media privacy settings",
+    'email': "Consider using email aliases for public registrations",
+    'phone': "Be cautious sharing phone numbers publicly",
+    'address': "Request removal of your address from people-search sites",
+    'image': "Check where your photos appear and restrict who can reuse them",
+}
+
+class ReportAggregator:
+    """Summary counts, findings and recommendations, updated one results section at a time.
+
+    Each section is summarized once when it is added (adding it again
+    replaces it), so a job can feed module results as they complete and
+    have its report ready when the last one lands.
+    """
+
+    def __init__(self, results: Dict = None):
+        self._sections = {}
+        self._lock = threading.Lock()
+        for module, data in (results or {}).items():
+            self.add(module, data)
+
+    def add(self, module: str, data):
+        """Fold in one module's results; incomplete outcomes and unknown sections contribute nothing"""
+        if module not in SECTIONS or (isinstance(data, dict) and data.get('status') in INCOMPLETE_STATUSES):
+            return
+        count_key, finding_type, severity = SECTIONS[module]
+        findings = []
+        if module == 'social_media':
+            # Platforms that did not complete carry an outcome dict instead of a profile list
+            counts = {platform: sum(1 for profile in profiles if _is_match(profile))
+                      for platform, profiles in (data or {}).items() if isinstance(profiles, list)}
+            findings = [{'type': finding_type, 'platform': platform, 'count': count, 'severity': severity}
+                        for platform, count in counts.items() if count]
+            count = sum(counts.values())
+            recommend = True
+        else:
+            count = self._count(module, data)
+            if count:
+                findings = [{'type': finding_type, 'count': count, 'severity': severity}]
+            recommend = bool(count)
+        with self._lock:
+            self._sections[module] = (count_key, count, findings, RECOMMENDATIONS[finding_type] if recommend else None)
+
+    def summary(self) -> Dict:
+        summary = dict.fromkeys(('total_findings', 'social_media_profiles', 'email_addresses',
+                                 'phone_numbers', 'addresses', 'images_found'), 0)
+        for count_key, count, _, _ in self._ordered():
+            summary[count_key] += count
+            summary['total_findings'] += count
+        return summary
+
+    def findings(self) -> List[Dict]:
+        return [finding for _, _, findings, _ in self._ordered() for finding in findings]
+
+    def recommendations(self) -> List[str]:
+        recommendations = []
+        for _, _, _, recommendation in self._ordered():
+            if recommendation and recommendation not in recommendations:
+                recommendations.append(recommendation)
+        return recommendations or ["No specific recommendations at this time"]
+
+    def _ordered(self) -> List:
+        with self._lock:
+            return [self._sections[module] for module in SECTIONS if module in self._sections]
+
+    @staticmethod
+    def _count(module: str, data) -> int:
+        if module == 'image':
+            # One list per search engine, next to the image's own metadata
+            return sum(1 for engine, matches in (data or {}).items()
+                       if engine != 'metadata' and isinstance(matches, list)
+                       for match in matches if _is_match(match))
+        if module == 'email':
+            return int(bool(data and data.get('valid_format')))
+        if module == 'phone':
+            return int(bool(data and data.get('valid')))
+        return len(data or [])
 
 class ReportGenerator:
     """Generate OSINT reports"""
     
-    def generate(self, search_results: Dict, report_id: str) -> Dict:
-        """Generate comprehensive OSINT report"""
+    def generate(self, search_results: Dict, report_id: str,
+                 aggregator: Optional[ReportAggregator] = None) -> Dict:
+        """Generate comprehensive OSINT report.
+
+        ``aggregator`` is reused when the results were already aggregated
+        as they arrived; otherwise they are summarized in a single pass.
+        """
+        if aggregator is None:
+            aggregator = ReportAggregator(search_results.get('results', {}))
         report = {
             'report_id': report_id,
             'generated_at': datetime.now().isoformat(),
-            'summary': self._generate_summary(search_results),
-            'findings': self._extract_findings(search_results),
-            'recommendations': self._generate_recommendations(search_results),
+            'summary': aggregator.summary(),
+            'findings': aggregator.findings(),
+            'recommendations': aggregator.recommendations(),
             'raw_data': search_results
         }
         return report
-    
-    def _generate_summary(self, results: Dict) -> Dict:
-        """Generate report summary"""
-        summary = {
-            'total_findings': 0,
-            'social_media_profiles': 0,
-            'email_addresses': 0,
-            'phone_numbers': 0,
-            'addresses': 0,
-            'images_found': 0
-        }
-        
-        if 'results' in results:
-            results_data = results['results']
-            
-            # Count social media profiles
-            if 'social_media' in results_data:
-                for platform, profiles in results_data['social_media'].items():
-                    summary['social_media_profiles'] += len(profiles)
-            
-            # Count emails
-            if 'emails' in results_data:
-                summary['email_addresses'] = len(results_data['emails'])
-            
-            # Count phones
-            if 'phones' in results_data:
-                summary['phone_numbers'] = len(results_data['phones'])
-            
-            # Count addresses
-            if 'addresses' in results_data:
-                summary['addresses'] = len(results_data['addresses'])
-            
-            # Count images
-            if 'image' in results_data:
-                summary['images_found'] = len(results_data.get('image', {}).get('results', []))
-        
-        summary['total_findings'] = (
-            summary['social_media_profiles'] +
-            summary['email_addresses'] +
-            summary['phone_numbers'] +
-            summary['addresses'] +
-            summary['images_found']
-        )
-        
-        return summary
-    
-    def _extract_findings(self, results: Dict) -> List[Dict]:
-        """Extract key findings"""
-        findings = []
-        
-        if 'results' in results:
-            results_data = results['results']
-            
-            # Social media findings
-            if 'social_media' in results_data:
-                for platform, profiles in results_data['social_media'].items():
-                    if profiles:
-                        findings.append({
-                            'type': 'social_media',
-                            'platform': platform,
-                            'count': len(profiles),
-                            'severity': 'medium'
-                        })
-            
-            # Email findings
-            if 'emails' in results_data and results_data['emails']:
-                findings.append({
-                    'type': 'email',
-                    'count': len(results_data['emails']),
-                    'severity': 'high'
-                })
-            
-            # Phone findings
-            if 'phones' in results_data and results_data['phones']:
-                findings.append({
-                    'type': 'phone',
-                    'count': len(results_data['phones']),
-                    'severity': 'high'
-                })
-        
-        return findings
-    
-    def _generate_recommendations(self, results: Dict) -> List[str]:
-        """Generate recommendations based on findings"""
-        recommendations = []
-        
-        if 'results' in results:
-            results_data = results['results']
-            
-            if 'social_media' in results_data:
-                recommendations.append("Review social media privacy settings")
-            
-            if 'emails' in results_data and results_data['emails']:
-                recommendations.append("Consider using email aliases for public registrations")
-            
-            if 'phones' in results_data and results_data['phones']:
-                recommendations.append("Be cautious sharing phone numbers publicly")
-        
-        if not recommendations:
-            recommendations.append("No specific recommendations at this time")
-        
-        return recommendations
-
@@ -0,0 +1,168 @@
+"""
+Report Store
+Compressed report files with raw search data shared between reports by content hash
+"""
+
+import gzip
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Iterable, Optional
+
+# Sections kept in the small per-report file; raw_data lives in a shared blob
+HEADER_SECTIONS = ('report_id', 'generated_at', 'summary', 'findings', 'recommendations')
+
+EXTENSIONS = {'gzip': '.json.gz', 'zstd': '.json.zst'}
+LEGACY_EXTENSION = '.json'
+# Only reports written by this store are pruned; plain .json reports from older versions are never removed
+PRUNED_SUFFIXES = tuple(EXTENSIONS.values())
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        return importlib.import_module('zstandard').ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        return importlib.import_module('zstandard').ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+class ReportStore:
+    """Reports on disk, one compressed file each plus deduplicated raw payloads.
+
+    ``<report_id>.json.gz`` holds everything but ``raw_data``, which is
+    stored once per distinct payload under ``raw/<sha256>.json.gz``, so
+    summaries and findings load without touching it. Reports beyond
+    ``max_reports`` or older than ``max_age`` seconds are pruned on save,
+    together with payloads no remaining report refers to; both limits are
+    off by default. Plain ``<report_id>.json`` files from older versions
+    are still readable and are never pruned.
+    """
+
+    def __init__(self, folder: str = 'reports', codec: str = 'gzip', max_reports: int = 0,
+                 max_age: float = 0):
+        if codec not in EXTENSIONS:
+            raise ValueError(f"Unknown report compression: {codec}")
+        if codec == 'zstd' and importlib.util.find_spec('zstandard') is None:
+            print("Report store: zstandard is not installed, using gzip")
+            codec = 'gzip'
+        self.folder = folder
+        self.raw_folder = os.path.join(folder, 'raw')
+        self.codec = codec
+        self.max_reports = max_reports
+        self.max_age = max_age
+        os.makedirs(self.raw_folder, exist_ok=True)
+
+    def save(self, report: Dict):
+        """Write a report, reusing the stored raw payload when an identical one exists"""
+        raw = json.dumps(report.get('raw_data'), sort_keys=True, separators=(',', ':'), default=str).encode()
+        digest = hashlib.sha256(raw).hexdigest()
+        header = {section: report[section] for section in HEADER_SECTIONS if section in report}
+        header['raw_ref'] = digest
+
+        # Both files get the same mtime: pruning keeps payloads no older than the oldest report
+        now = time.time()
+        self._save_raw(digest, raw, now)
+        path = os.path.join(self.folder, report['report_id'] + EXTENSIONS[self.codec])
+        self._write(path, json.dumps(header, separators=(',', ':'), default=str).encode(), now)
+        self.prune()
+
+    def load(self, report_id: str, sections: Iterable[str] = None) -> Optional[Dict]:
+        """Read a report, or only ``sections`` of it (raw_data is read only when asked for)"""
+        wanted = set(sections) if sections is not None else None
+        for codec, extension in EXTENSIONS.items():
+            try:
+                with open(os.path.join(self.folder, report_id + extension), 'rb') as f:
+                    report = json.loads(_decompress(f.read(), codec))
+            except FileNotFoundError:
+                continue
+            digest = report.pop('raw_ref', None)
+            if wanted is None or 'raw_data' in wanted:
+                report['raw_data'] = self._load_raw(digest)
+            return self._select(report, wanted)
+
+        try:
+            with open(os.path.join(self.folder, report_id + LEGACY_EXTENSION)) as f:
+                return self._select(json.load(f), wanted)
+        except FileNotFoundError:
+            return None
+
+    def prune(self):
+        """Drop compressed reports past the count or age limit, then payloads only they used"""
+        if not self.max_reports and not self.max_age:
+            return
+        reports = sorted((entry.stat().st_mtime, entry.path) for entry in os.scandir(self.folder)
+                         if entry.is_file() and entry.name.endswith(PRUNED_SUFFIXES))
+        excess = len(reports) - self.max_reports if self.max_reports else 0
+        cutoff = time.time() - self.max_age if self.max_age else 0
+        kept = []
+        for index, (mtime, path) in enumerate(reports):
+            if index < excess or mtime < cutoff:
+                self._remove(path)
+            else:
+                kept.append(mtime)
+        if len(kept) == len(reports):
+            return
+
+        oldest = kept[0] if kept else time.time()
+        for entry in os.scandir(self.raw_folder):
+            if entry.is_file() and entry.stat().st_mtime < oldest:
+                self._remove(entry.path)
+
+    def stats(self) -> Dict:
+        """Report and payload counts and the bytes they take on disk"""
+        counts = {'reports': 0, 'raw_payloads': 0, 'bytes': 0}
+        for folder, key in ((self.folder, 'reports'), (self.raw_folder, 'raw_payloads')):
+            for entry in os.scandir(folder):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    counts[key] += 1
+                    counts['bytes'] += entry.stat().st_size
+        return counts
+
+    def _save_raw(self, digest: str, raw: bytes, now: float):
+        for extension in EXTENSIONS.values():
+            try:
+                # Already stored: refresh its mtime so pruning keeps it for the new report
+                os.utime(os.path.join(self.raw_folder, digest + extension), (now, now))
+                return
+            except FileNotFoundError:
+                continue
+        self._write(os.path.join(self.raw_folder, digest + EXTENSIONS[self.codec]), raw, now)
+
+    def _load_raw(self, digest: Optional[str]):
+        for codec, extension in EXTENSIONS.items():
+            try:
+                with open(os.path.join(self.raw_folder, f'{digest}{extension}'), 'rb') as f:
+                    return json.loads(_decompress(f.read(), codec))
+            except FileNotFoundError:
+                continue
+        return None
+
+    def _write(self, path: str, data: bytes, mtime: float):
+        # Write then rename, so readers in other workers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_compress(data, self.codec))
+            os.utime(tmp_path, (mtime, mtime))
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _select(report: Dict, wanted: Optional[set]) -> Dict:
+        if wanted is None:
+            return report
+        return {key: value for key, value in report.items() if key == 'report_id' or key in wanted}
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,121 @@
+"""
+DNS Resolver
+TTL-aware caching resolver with negative caching and query coalescing
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import dns.exception
+import dns.resolver
+
+from utils.cache import MemoryBackend
+from utils.singleflight import SingleFlight
+
+class CachingResolver:
+    """Resolve DNS records, caching answers for their record TTL"""
+
+    def __init__(self, nameservers: List[str] = None, port: int = 53, timeout: float = 5.0,
+                 negative_ttl: float = 300, max_ttl: float = 24 * 60 * 60,
+                 max_entries: int = 4096, max_workers: int = 8):
+        # Explicit nameservers (e.g. a local stub server) skip /etc/resolv.conf
+        self.resolver = dns.resolver.Resolver(configure=not nameservers)
+        if nameservers:
+            self.resolver.nameservers = list(nameservers)
+            self.resolver.port = port
+        self.resolver.lifetime = timeout
+        self.negative_ttl = negative_ttl
+        self.max_ttl = max_ttl
+        self._cache = MemoryBackend(max_entries)
+        self._flights = SingleFlight()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='dns')
+
+    @classmethod
+    def from_env(cls) -> 'CachingResolver':
+        """Build a resolver from DNS_NAMESERVERS (host[:port],...) and DNS_TIMEOUT"""
+        nameservers, port = None, 53
+        configured = os.environ.get('DNS_NAMESERVERS')
+        if configured:
+            nameservers = []
+            for server in configured.split(','):
+                host, _, server_port = server.strip().partition(':')
+                nameservers.append(host)
+                port = int(server_port) if server_port else port
+        return cls(nameservers=nameservers, port=port,
+                   timeout=float(os.environ.get('DNS_TIMEOUT', 5.0)))
+
+    def resolve(self, name: str, rdtype: str) -> Dict:
+        """Resolve one record set.
+
+        Returns a dict with ``records`` and ``ttl``; failures carry an
+        ``error`` instead. NXDOMAIN/NoAnswer results are cached for
+        ``negative_ttl``; concurrent queries for the same name and type
+        share a single upstream lookup.
+        """
+        key = f"{name.lower().rstrip('.')}/{rdtype.upper()}"
+        found, entry = self._cache.get(key)
+        if found:
+            return entry
+        return self._flights.do(key, lambda: self._lookup(key, name, rdtype), label=rdtype.upper())
+
+    def resolve_many(self, queries: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict]:
+        """Resolve several (name, rdtype) pairs concurrently"""
+        futures = {query: self._executor.submit(self.resolve, *query) for query in queries}
+        return {query: future.result() for query, future in futures.items()}
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict:
+        """Cache size and coalescing counters"""
+        return {'entries': len(self._cache), 'single_flight': self._flights.stats()}
+
+    def _lookup(self, key: str, name: str, rdtype: str) -> Dict:
+        """Query upstream and cache the entry for its TTL"""
+        entry, ttl = self._query(name, rdtype)
+        if ttl:
+            self._cache.set(key, entry, ttl)
+        return entry
+
+    def _query(self, name: str, rdtype: str) -> Tuple[Dict, float]:
+        """Query upstream, returning the entry and how long it may be cached"""
+        entry = {'name': name, 'type': rdtype, 'records': [], 'ttl': 0}
+        try:
+            answer = self.resolver.resolve(name, rdtype)
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer) as e:
+            entry['error'] = 'NXDOMAIN' if isinstance(e, dns.resolver.NXDOMAIN) else 'NoAnswer'
+            entry['ttl'] = self.negative_ttl
+            return entry, self.negative_ttl
+        except dns.exception.DNSException as e:
+            # Timeouts and server failures are transient; don't cache them
+            entry['error'] = str(e) or e.__class__.__name__
+            return entry, 0
+
+        entry['records'] = [self._format(rdata) for rdata in answer]
+        entry['ttl'] = min(answer.rrset.ttl, self.max_ttl)
+        return entry, entry['ttl']
+
+    @staticmethod
+    def _format(rdata) -> str:
+        """Render a record the way callers expect to read it"""
+        if hasattr(rdata, 'exchange'):
+            return str(rdata.exchange)
+        if hasattr(rdata, 'strings'):
+            return b''.join(rdata.strings).decode('utf-8', errors='replace')
+        if hasattr(rdata, 'address'):
+            return rdata.address
+        return rdata.to_text()
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+def get_resolver() -> CachingResolver:
+    """Return the process-wide caching resolver, creating it on first use"""
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = CachingResolver.from_env()
+    return _resolver
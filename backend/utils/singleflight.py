@@ -0,0 +1,61 @@
+"""
+Single-Flight
+Coalesces concurrent identical calls so only one of them does the work
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers with the same key"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._executed = {}
+        self._coalesced = {}
+
+    def do(self, key: str, fn: Callable[[], Any], label: str = 'default') -> Any:
+        """Run ``fn`` for ``key`` unless an identical call is already running.
+
+        Callers that arrive while the call is in flight wait for it and get
+        the same result (or exception). ``label`` groups keys in stats().
+        """
+        with self._lock:
+            pending = self._calls.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._calls[key] = Future()
+                self._executed[label] = self._executed.get(label, 0) + 1
+            else:
+                self._coalesced[label] = self._coalesced.get(label, 0) + 1
+        if not owner:
+            return pending.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        else:
+            pending.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self) -> Dict:
+        """Executed vs coalesced call counts, overall and per label"""
+        with self._lock:
+            executed, coalesced = dict(self._executed), dict(self._coalesced)
+            in_flight = len(self._calls)
+        return {
+            'in_flight': in_flight,
+            'executed': sum(executed.values()),
+            'coalesced': sum(coalesced.values()),
+            'labels': {
+                label: {'executed': executed.get(label, 0), 'coalesced': coalesced.get(label, 0)}
+                for label in sorted(set(executed) | set(coalesced))
+            }
+        }
@@ -0,0 +1,171 @@
+"""
+Image Uploads
+Uploads written once into memory as the request is parsed, spilling large ones to a private temp file, and shared by every consumer
+"""
+
+import base64
+import hashlib
+import io
+import os
+import tempfile
+from functools import cached_property
+from typing import BinaryIO, Optional
+
+# Uploads up to this many bytes stay in memory; larger ones spill to a uniquely named temp file
+SPOOL_MAX = 2 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# Largest image (width x height) accepted; bigger ones are refused before any pixel is decoded
+MAX_PIXELS = 40_000_000
+
+class ImageTooLarge(ValueError):
+    """Raised for an image whose dimensions exceed the pixel limit"""
+
+def check_pixels(width: int, height: int, max_pixels: int = MAX_PIXELS):
+    if width * height > max_pixels:
+        raise ImageTooLarge(f"Image is {width}x{height}, more than {max_pixels} pixels")
+
+class UploadedImage:
+    """One uploaded image, read from the request exactly once.
+
+    The SHA-256 is computed while the upload is read; ``data`` and
+    ``base64`` are derived on first use and then shared by every engine.
+    Uploads over ``spool_max`` bytes go to a temp file with a unique name
+    in ``folder``, removed by ``close`` (or on leaving a ``with`` block),
+    so concurrent uploads with the same filename never collide.
+    """
+
+    def __init__(self, filename: str, spool_max: int = SPOOL_MAX, folder: str = None):
+        self.filename = filename
+        self.spool_max = spool_max
+        self.folder = folder
+        self.size = 0
+        self.sha256 = None
+        self._digest = hashlib.sha256()
+        self._buffer = io.BytesIO()
+        self._spill = None
+
+    @classmethod
+    def read(cls, stream: BinaryIO, filename: str, spool_max: int = SPOOL_MAX,
+             folder: str = None) -> 'UploadedImage':
+        """Consume ``stream`` in chunks, hashing as it goes"""
+        upload = cls(filename, spool_max, folder)
+        try:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                upload._write(chunk)
+        except BaseException:
+            upload.close()
+            raise
+        upload.finish()
+        return upload
+
+    @classmethod
+    def from_path(cls, path: str, **kwargs) -> 'UploadedImage':
+        with open(path, 'rb') as f:
+            return cls.read(f, os.path.basename(path), **kwargs)
+
+    def finish(self):
+        """Mark the upload complete: fix its SHA-256 and flush any spilled bytes"""
+        if self.sha256 is None:
+            self.sha256 = self._digest.hexdigest()
+            if self._spill is not None:
+                self._spill.flush()
+
+    @property
+    def path(self) -> Optional[str]:
+        """Temp file holding a spilled upload; None while it is in memory"""
+        return self._spill.name if self._spill is not None else None
+
+    @cached_property
+    def data(self) -> bytes:
+        if self._spill is None:
+            return self._buffer.getvalue()
+        self._spill.seek(0)
+        return self._spill.read()
+
+    @cached_property
+    def base64(self) -> str:
+        return base64.b64encode(self.data).decode('ascii')
+
+    def open(self) -> BinaryIO:
+        """A fresh readable stream over the upload (for Pillow and other file consumers); the caller closes it"""
+        if self._spill is None:
+            return io.BytesIO(self.data)
+        return open(self._spill.name, 'rb')
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        self._buffer = None
+
+    def __enter__(self) -> 'UploadedImage':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write(self, chunk: bytes):
+        self._digest.update(chunk)
+        self.size += len(chunk)
+        if self._spill is None and self.size > self.spool_max:
+            self._spill = tempfile.NamedTemporaryFile(
+                prefix='upload-', suffix=os.path.splitext(self.filename)[1], dir=self.folder)
+            self._spill.write(self._buffer.getvalue())
+            self._buffer = None
+        (self._spill or self._buffer).write(chunk)
+
+class UploadStream(io.RawIOBase):
+    """Writable stream handed to the multipart parser, filling an UploadedImage as the body is parsed.
+
+    Werkzeug would otherwise spool each file part to a stream of its own,
+    to be copied into an UploadedImage afterwards. The parser rewinds the
+    stream once the part is complete, which finishes the upload; reads
+    after that see its bytes.
+    """
+
+    def __init__(self, image: UploadedImage):
+        super().__init__()
+        self.image = image
+        self._reader = None
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def write(self, chunk) -> int:
+        self.image._write(bytes(chunk))
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._reading().seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._reading().tell() if self._reader is not None else self.image.size
+
+    def read(self, size: int = -1) -> bytes:
+        return self._reading().read(size)
+
+    def readinto(self, buffer) -> int:
+        data = self._reading().read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def readline(self, size: int = -1) -> bytes:
+        return self._reading().readline(size)
+
+    def close(self):
+        if self._reader is not None:
+            self._reader.close()
+        self.image.close()
+        super().close()
+
+    def _reading(self) -> BinaryIO:
+        if self._reader is None:
+            self.image.finish()
+            self._reader = self.image.open()
+        return self._reader
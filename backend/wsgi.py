@@ -0,0 +1,8 @@
+"""
+OSINTZeUS WSGI entry point
+Used by production servers: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from app import create_app
+
+app = create_app()
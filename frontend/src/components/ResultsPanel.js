@@ -1,5 +1,36 @@
 import React from 'react';
 
+// Failed, slow or skipped lookups come back as {status, elapsed_ms} in place of their result
+const isOutcome = (value) =>
+  value !== null && typeof value === 'object' && !Array.isArray(value) && typeof value.status === 'string';
+
+const outcomeMessage = (outcome) => {
+  if (outcome.status === 'throttled') return 'Rate limited by provider, try again later';
+  if (outcome.status === 'circuit_open') return 'Provider unavailable, skipped';
+  if (outcome.status === 'timeout') return `Lookup timed out after ${outcome.elapsed_ms}ms`;
+  return outcome.error ? `Lookup ${outcome.status}: ${outcome.error}` : `Lookup ${outcome.status}`;
+};
+
+const OutcomeNotice = ({ outcome }) => (
+  <p className="text-yellow-700 text-sm">{outcomeMessage(outcome)}</p>
+);
+
+const renderList = (items, emptyText) => {
+  if (isOutcome(items)) return <OutcomeNotice outcome={items} />;
+  if (!Array.isArray(items) || items.length === 0) {
+    return <p className="text-gray-500 text-sm">{emptyText}</p>;
+  }
+  return (
+    <div className="space-y-2">
+      {items.map((item, idx) => (
+        <div key={idx} className="bg-gray-50 p-3 rounded border">
+          <pre className="text-sm">{JSON.stringify(item, null, 2)}</pre>
+        </div>
+      ))}
+    </div>
+  );
+};
+
 const ResultsPanel = ({ results, loading }) => {
   if (loading) {
     return (
@@ -25,10 +56,14 @@ const ResultsPanel = ({ results, loading }) => {
         {data.social_media && (
           <div className="bg-white rounded-lg shadow p-6">
             <h3 className="text-xl font-bold text-gray-800 mb-4">Social Media Profiles</h3>
-            {Object.entries(data.social_media).map(([platform, profiles]) => (
+            {isOutcome(data.social_media) ? (
+              <OutcomeNotice outcome={data.social_media} />
+            ) : Object.entries(data.social_media).map(([platform, profiles]) => (
               <div key={platform} className="mb-4">
                 <h4 className="font-semibold text-gray-700 capitalize mb-2">{platform}</h4>
-                {profiles.length > 0 ? (
+                {!Array.isArray(profiles) ? (
+                  <OutcomeNotice outcome={profiles} />
+                ) : profiles.length > 0 ? (
                   <div className="space-y-2">
                     {profiles.map((profile, idx) => (
                       <div key={idx} className="bg-gray-50 p-3 rounded border">
@@ -60,13 +95,7 @@ const ResultsPanel = ({ results, loading }) => {
         {data.emails && (
           <div className="bg-white rounded-lg shadow p-6">
             <h3 className="text-xl font-bold text-gray-800 mb-4">Email Addresses</h3>
-            <div className="space-y-2">
-              {data.emails.map((email, idx) => (
-                <div key={idx} className="bg-gray-50 p-3 rounded border">
-                  <pre className="text-sm">{JSON.stringify(email, null, 2)}</pre>
-                </div>
-              ))}
-            </div>
+            {renderList(data.emails, 'No email addresses found')}
           </div>
         )}
 
@@ -74,13 +103,7 @@ const ResultsPanel = ({ results, loading }) => {
         {data.phones && (
           <div className="bg-white rounded-lg shadow p-6">
             <h3 className="text-xl font-bold text-gray-800 mb-4">Phone Numbers</h3>
-            <div className="space-y-2">
-              {data.phones.map((phone, idx) => (
-                <div key={idx} className="bg-gray-50 p-3 rounded border">
-                  <pre className="text-sm">{JSON.stringify(phone, null, 2)}</pre>
-                </div>
-              ))}
-            </div>
+            {renderList(data.phones, 'No phone numbers found')}
           </div>
         )}
 
@@ -47,6 +47,19 @@ export const searchWiFi = async (location) => {
 };
 
 export const generateReport = async (searchResults) => {
+  // The server keeps recent results by search_id; resend them only once they have expired
+  if (searchResults.search_id) {
+    try {
+      const response = await api.post('/report/generate', {
+        search_id: searchResults.search_id,
+      });
+      return response.data;
+    } catch (error) {
+      if (!error.response || error.response.status !== 404) {
+        throw error;
+      }
+    }
+  }
   const response = await api.post('/report/generate', {
     search_results: searchResults,
   });
@@ -58,5 +71,36 @@ export const getReport = async (reportId) => {
   return response.data;
 };
 
+export const createJob = async (type, query, options) => {
+  const response = await api.post('/jobs', {
+    type,
+    query,
+    options,
+  });
+  return response.data;
+};
+
+export const getJob = async (jobId) => {
+  const response = await api.get(`/jobs/${jobId}`);
+  return response.data;
+};
+
+// Calls onModule for each module result as it lands and onDone with the final job
+export const subscribeToJob = (jobId, { onModule, onDone, onError } = {}) => {
+  const source = new EventSource(`${API_BASE_URL}/jobs/${jobId}/events`);
+  source.addEventListener('module', (event) => {
+    if (onModule) onModule(JSON.parse(event.data));
+  });
+  source.addEventListener('done', (event) => {
+    source.close();
+    if (onDone) onDone(JSON.parse(event.data));
+  });
+  source.onerror = (error) => {
+    source.close();
+    if (onError) onError(error);
+  };
+  return () => source.close();
+};
+
 export default api;
 